@@ -30,33 +30,150 @@ Requisitos de runtime
 
 from __future__ import annotations
 
+import bisect
 import json
 import locale
 import logging
 import os
+import pty
+import re
+import selectors
 import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+import termios
 import threading
 import time
-from dataclasses import dataclass
+import tty
+from dataclasses import dataclass, field, fields
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from functools import lru_cache
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 # =============================================================================
 # Logging
 # =============================================================================
 
+# GNUSK_DEBUG=1 liga o nível DEBUG (inclui log de chaves de tradução ausentes)
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.DEBUG if os.environ.get("GNUSK_DEBUG", "").lower() in {"1", "true", "yes", "on"} else logging.INFO,
     format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
 )
 LOG = logging.getLogger("gnushark")
 
+# JSON rápido (opcional)
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+# inotify para esperar a sentinela sem polling (opcional)
+try:
+    from inotify_simple import INotify, flags as inotify_flags  # type: ignore
+except ImportError:
+    INotify = None  # type: ignore
+
+# =============================================================================
+# CLI sem UI: --version e auto-resposta de prompts (pacman/pamac)
+# =============================================================================
+
+APP_TITLE = "GNU/Shark"
+APP_VERSION = "1.0.0"  # versão exibida no diálogo Sobre e usada no CLI --version
+
+def _print_version_and_exit() -> None:
+    """Imprime a versão no CLI e encerra."""
+    print(f"{APP_TITLE} {APP_VERSION}")
+    sys.exit(0)
+
+# Padrões compilados uma única vez, testados em ordem (primeiro que casar responde).
+# Force LC_ALL=C no comando para estabilizar os prompts.
+_PROMPT_PATTERNS: Tuple[Tuple["re.Pattern[bytes]", bytes], ...] = (
+    # Confirmar apenas operações de instalação/continuidade/substituição
+    (re.compile(rb"(?i)(::\s*)?(Proceed|Install|Continue|Replace)[^?\n]*\?"), b"y\r"),
+    (re.compile(rb"(?i)(::\s*)?Import[^.\n]*PGP[^?\n]*\?"), b"y\r"),
+    # Nunca confirmar remoções automaticamente
+    (re.compile(rb"(?i)\b(Remove|Remover)\b[^?\n]*\?"), b"n\r"),
+    # Prompts em PT (sim): Deseja/Continuar/Substituir/Conflit(o)
+    (re.compile(rb"(?i)(Deseja|Continuar|Substituir|Conflit)[^?\n]*\?"), b"s\r"),
+    (re.compile(rb"(?i)press[^\n]*enter[^\n]*continue"), b"\r"),
+)
+
+def auto_answer(cmd: str) -> int:
+    """
+    Executa `bash -lc cmd` num pty, espelhando a saída e respondendo aos prompts
+    conhecidos (_PROMPT_PATTERNS). A entrada do usuário (ex.: senha do sudo) é
+    repassada ao pty. Retorna o código de saída do comando.
+    """
+    print(f">>> running: {cmd}", flush=True)
+    pid, fd = pty.fork()
+    if pid == 0:  # filho
+        try:
+            os.execvpe("bash", ["bash", "-lc", cmd], dict(os.environ, LC_ALL="C"))
+        finally:
+            os._exit(127)
+
+    tty_fd = sys.stdin.fileno() if sys.stdin and sys.stdin.isatty() else -1
+    saved_tty = None
+    if tty_fd >= 0:
+        try:
+            saved_tty = termios.tcgetattr(tty_fd)
+            tty.setraw(tty_fd)
+        except termios.error:
+            saved_tty = None
+
+    sel = selectors.DefaultSelector()
+    sel.register(fd, selectors.EVENT_READ)
+    if tty_fd >= 0:
+        sel.register(tty_fd, selectors.EVENT_READ)
+    out_fd = sys.stdout.fileno()
+    line = b""  # só a linha corrente: nenhum padrão atravessa '\n'
+    done = False
+    try:
+        while not done:
+            for key, _ev in sel.select():
+                if key.fd == tty_fd:
+                    data = os.read(tty_fd, 1024)
+                    if data:
+                        os.write(fd, data)
+                    else:
+                        sel.unregister(tty_fd)
+                    continue
+                try:
+                    data = os.read(fd, 4096)
+                except OSError:  # EIO: filho encerrou
+                    data = b""
+                if not data:
+                    done = True
+                    break
+                os.write(out_fd, data)
+                line = (line + data).rsplit(b"\n", 1)[-1][-4096:]
+                for rx, answer in _PROMPT_PATTERNS:
+                    if rx.search(line):
+                        os.write(fd, answer)
+                        line = b""
+                        break
+    finally:
+        sel.close()
+        if saved_tty is not None:
+            termios.tcsetattr(tty_fd, termios.TCSADRAIN, saved_tty)
+        os.close(fd)
+    _pid, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+# Caminhos rápidos do CLI: resolvidos antes de carregar GI/GTK (introspecção é o custo
+# dominante do import e nenhum deles precisa de UI).
+if __name__ == "__main__":
+    if "--version" in sys.argv or "-V" in sys.argv:
+        _print_version_and_exit()
+    if len(sys.argv) == 3 and sys.argv[1] == "--auto-answer":
+        sys.exit(auto_answer(sys.argv[2]))
+
+
 # =============================================================================
 # GTK imports
 # =============================================================================
@@ -88,240 +205,264 @@ def is_x11() -> bool:
 # I18N
 # =============================================================================
 
-def _detect_ui_lang() -> str:
-    """
-    Retorna 'pt' ou 'en' com base no idioma do sistema.
-    Ordem de checagem (primeira vitória):
-      1) GLib.get_language_names() (respeita configuração do ambiente GTK)
-      2) $LANGUAGE, $LC_ALL, $LC_MESSAGES, $LANG
-      3) locale.getlocale(LC_MESSAGES) / locale.getlocale()
-    Qualquer outro idioma => 'en' (fallback seguro).
-    """
-    def _norm(v: str) -> str:
-        return v.split('.')[0].replace('_', '-').lower().strip() if v else ""
-
-    # 1) Preferir GLib (respeita o ambiente do processo/desktop)
-    try:
-        langs = GLib.get_language_names() or []
-        for cand in langs:
-            c = _norm(cand)
-            if c.startswith("pt"):
-                return "pt"
-            if c.startswith("en"):
-                return "en"
-    except Exception:
-        pass
+_UI_LANGS: Tuple[str, ...] = ("pt", "en")
 
-    # 2) Variáveis de ambiente comuns (inclui LANGUAGE)
+def _ui_lang_candidates() -> Iterator[str]:
+    """Gera (preguiçosamente) os nomes de idioma do ambiente, na ordem de preferência."""
     for var in ("LANGUAGE", "LC_ALL", "LC_MESSAGES", "LANG"):
-        val = os.environ.get(var, "")
-        if val:
-            val = _norm(val)
-            if val.startswith("pt"):
-                return "pt"
-            if val.startswith("en"):
-                return "en"
-
-    # 3) locale.getlocale
-    loc = ""
+        yield os.environ.get(var, "")
     try:
-        loc = (locale.getlocale(getattr(locale, "LC_MESSAGES", locale.LC_ALL))[0] or "")
+        yield from (GLib.get_language_names() or [])
     except Exception:
         pass
-    if not loc:
+    for getter in (lambda: locale.getlocale(getattr(locale, "LC_MESSAGES", locale.LC_ALL)),
+                   locale.getlocale):
         try:
-            loc = (locale.getlocale()[0] or "")
+            yield getter()[0] or ""
         except Exception:
-            loc = ""
+            pass
 
-    loc = _norm(loc)
-    if loc.startswith("pt"):
-        return "pt"
-    if loc.startswith("en"):
-        return "en"
-    return "en"
+def _pick_ui_lang(cands: Iterable[str]) -> str:
+    """Primeiro prefixo de 2 letras aceito em _UI_LANGS; '' se nenhum."""
+    for c in cands:
+        if not c:
+            continue
+        p = c[:2].lower()
+        if p in _UI_LANGS:
+            return p
+    return ""
 
+@lru_cache(maxsize=1)
+def _detect_ui_lang() -> str:
+    """
+    Retorna 'pt' ou 'en' com base no idioma do sistema.
+    Ordem de checagem (primeira vitória, em uma única passada):
+      1) $LANGUAGE, $LC_ALL, $LC_MESSAGES, $LANG (mais barato, sem lock)
+      2) GLib.get_language_names() (respeita configuração do ambiente GTK)
+      3) locale.getlocale(LC_MESSAGES) / locale.getlocale()
+    Qualquer outro idioma => 'en' (fallback seguro).
+    """
+    return _pick_ui_lang(_ui_lang_candidates()) or "en"
 
-UI_LANG = _detect_ui_lang()
 
-# Traduções: a chave SEMPRE é o texto original em PT.
-_TRANSL: Dict[str, Dict[str, str]] = {
-    "en": {
-        # Cabeçalho / geral
-        "Um HUB de ferramentas e utilitários para jogos no Linux.": "A hub of tools and utilities for gaming on Linux.",
-        "Wiki": "Wiki",
-        "Reportar Bug": "Report a bug",
-        "Sobre": "About",
-        "Página do projeto": "Project page",
-        # Polkit / permissões
-        "Executar tarefas administrativas do GNU/Shark": "Run administrative tasks for GNU/Shark",
-        "Permitir que o GNU Shark execute ações com privilégios administrativas?": "Allow GNU/Shark to perform administrative actions?",
-        # About
-        "Desenvolvido por Gabriel Ruas Santos": "Developed by Gabriel Ruas Santos",
-
-        # Cards e descrições
-        "Drivers": "Drivers",
-        "Otimizações": "Optimizations",
-        "Ferramentas": "Tools",
-        "Extras": "Extras",
-        "Repositórios": "Repositories",
-        "Repositórios adicionais": "Additional repositories",
-        "Drivers e runtimes necessários para sua GPU.": "Drivers and runtimes required for your GPU.",
-        "Ajustes de desempenho para jogos.": "Performance tweaks for gaming.",
-        "Gerenciadores de jogos e utilitários.": "Game launchers and utilities.",
-        "Recursos adicionais e opcionais.": "Additional and optional resources.",
-        "Ajustes de desempenho para melhorar a experiência em jogos.": "Performance tweaks to improve your gaming experience.",
-        "Gerenciadores de jogos e utilitários complementares.": "Game managers and complementary utilities.",
-        "Recursos adicionais e opcionais para usuários avançados.": "Additional and optional resources for advanced users.",
-
-        # Itens e tooltips
-        "Intel Mesa": "Intel Mesa",
-        "NVIDIA Proprietário": "NVIDIA Proprietary",
-        "AMD Mesa/RADV": "AMD Mesa/RADV",
-        "Driver NVIDIA oficial + Vulkan (loader).": "Official NVIDIA driver + Vulkan (loader).",
-        "Drivers Intel (Mesa) + Vulkan (loader e ICD).": "Intel drivers (Mesa) + Vulkan (loader and ICD).",
-        "Drivers AMD (Mesa/RADV) + Vulkan (loader e ICD).": "AMD drivers (Mesa/RADV) + Vulkan (loader and ICD).",
-
-        "GameMode": "GameMode",
-        "Ativa otimizações de performance enquanto joga": "Enables performance optimizations while gaming",
-        "Tuned": "Tuned",
-        "Perfis automáticos de performance e economia de energia": "Automatic performance and power-saving profiles",
-        "cpupower": "cpupower",
-        "Ajusta frequência e modos de energia da CPU": "Adjust CPU frequency and power modes",
-        "Zram": "Zram",
-        "Configurar compressão de memória RAM para melhorar desempenho": "Configure compressed RAM (zram) to improve performance",
-        "Preload": "Preload",
-        "Daemon que pré-carrega apps para abrir mais rápido": "Daemon that preloads apps to open faster",
-
-        "Steam": "Steam",
-        "Cliente oficial de jogos": "Official game client",
-        "Lutris": "Lutris",
-        "Gerenciador de jogos para rodar títulos nativos, Wine e emuladores": "Game manager for native titles, Wine and emulators",
-        "Heroic": "Heroic",
-        "Cliente alternativo para Epic Games Store e GOG": "Alternative client for Epic Games Store and GOG",
-        "ProtonPlus": "ProtonPlus",
-        "Gerenciador de versões do ProtonGE para compatibilidade de jogos": "ProtonGE versions manager for game compatibility",
-        "Wine": "Wine",
-        "Camada de compatibilidade para rodar aplicativos do Windows": "Compatibility layer to run Windows applications",
-        "Bottles": "Bottles",
-        "Gerenciador de aplicações e jogos Windows em garrafas Wine isoladas": "Manager for Windows apps/games in isolated Wine bottles",
-        "MangoHUD": "MangoHUD",
-        "Exibe FPS e métricas de desempenho durante os jogos": "Display FPS and performance metrics in-game",
-        "Steam Acolyte": "Steam Acolyte",
-        "Ferramenta CLI para configurar multiplas contas Steam": "CLI tool to manage multiple Steam accounts",
-
-        "Goverlay": "Goverlay",
-        "Interface gráfica para MangoHUD e afins": "GUI for MangoHUD and related tools",
-        "Python Steam": "Python Steam",
-        "Biblioteca Python para API do Steam": "Python library for the Steam API",
-        "CoreCtrl (AMD)": "CoreCtrl (AMD)",
-        "Controle avançado de GPU/CPU AMD com perfis de energia": "Advanced AMD GPU/CPU control with power profiles",
-        "GWE (NVIDIA)": "GWE (NVIDIA)",
-        "GreenWithEnvy: Monitorar e controlar GPU NVIDIA (clocks, temperatura, ventoinha)": "GreenWithEnvy: Monitor and control NVIDIA GPU (clocks, temperature, fan)",
-        "AdwSteamGtk": "AdwSteamGtk",
-        "Deixa o Steam no visual GNOME/libadwaita": "Give Steam a GNOME/libadwaita look",
-
-        # Diálogos / botões comuns
-        "Instalação": "Installation",
-        "Cancelar": "Cancel",
-        "OK": "OK",
-        "Abrir": "Open",
-        "Abrir {label} agora?": "Open {label} now?",
-        "Confirmar": "Confirm",
-        "Instalar {label} via Flatpak?": "Install {label} via Flatpak?",
-        "Nada a instalar": "Nothing to install",
-        "Não há pacotes pendentes para {label}.": "There are no pending packages for {label}.",
-        "Instalar {pkgs_str}?": "Install {pkgs_str}?",
-        "Processo finalizado.": "Process finished.",
-        # Multilib & AUR
-        "Multilib": "Multilib",
-        "Alguns pacotes 32-bit requerem o repositório [multilib].\n\nAtivar automaticamente e atualizar bancos de dados agora?": "Some 32-bit packages require the [multilib] repository.\n\nEnable it automatically and refresh databases now?",
-        "Ative manualmente em /etc/pacman.conf e rode: sudo pacman -Syy": "Enable it manually in /etc/pacman.conf and run: sudo pacman -Syy",
-        "AUR": "AUR",
-        "Instalação abortada por falta de helper AUR.": "Installation aborted due to missing AUR helper.",
-        "AUR helper ausente": "Missing AUR helper",
-        # Execução/headless
-        "Concluído (modo sem terminal)": "Completed (headless mode)",
-        "Execução finalizada.\nLog salvo em: {log_path}\n\nVocê pode abrir o arquivo de log para detalhes.": "Execution finished.\nLog saved at: {log_path}\n\nYou can open the log file for details.",
-        "Falha na execução": "Execution failure",
-        "Falha ao abrir": "Failed to open",
-        "Não foi possível iniciar '{exe}'.\n\n{e}": "Could not start '{exe}'.\n\n{e}",
-        "Não foi possível construir o script de instalação (helper AUR ausente?).": "Couldn't build the installation script (missing AUR helper?).",
-        # Hardware incompatível
-        "Hardware incompatível": "Incompatible hardware",
-        "Não detectei GPU NVIDIA neste sistema. Instalação do driver NVIDIA foi bloqueada.": "No NVIDIA GPU detected on this system. NVIDIA driver installation was blocked.",
-        "Processador AMD detectado e nenhuma GPU Intel identificada. Instalação de drivers Intel foi bloqueada.": "AMD CPU detected and no Intel GPU identified. Intel driver installation was blocked.",
-        "Não detectei GPU Intel neste sistema. Instalação de drivers Intel foi bloqueada.": "No Intel GPU detected on this system. Intel driver installation was blocked.",
-        "Não detectei GPU AMD neste sistema. Instalação de drivers AMD foi bloqueada.": "No AMD GPU detected on this system. AMD driver installation was blocked.",
-        # Kernel headers / NVIDIA flow
-        "Atenção": "Attention",
-        "Instale os headers do kernel e tente novamente para usar nvidia-dkms.": "Install kernel headers and try again to use nvidia-dkms.",
-        "Headers do kernel": "Kernel headers",
-        "Kernel atual: {ver}\nPara compilar módulos DKMS (ex.: nvidia-dkms) é recomendado instalar {cand}.\n\nInstalar agora?": "Current kernel: {ver}\nTo build DKMS modules (e.g., nvidia-dkms) it's recommended to install {cand}.\n\nInstall now?",
-        "Instalação de {cand} iniciada. Assim que concluir, volte e tente novamente.": "Installation of {cand} started. Once finished, come back and try again.",
-        "NVIDIA: regenerar initramfs": "NVIDIA: regenerate initramfs",
-        "Detectei o driver NVIDIA carregado.\nRegenerar initramfs agora com {tool}?": "NVIDIA driver seems loaded.\nRegenerate initramfs now with {tool}?",
-        "Reiniciar": "Reboot",
-        "Reiniciar o sistema agora?": "Reboot the system now?",
-        # Pós-instalação / info
-        "Serviço ativado.\n\nResultado do teste:\n{out}": "Service enabled.\n\nTest result:\n{out}",
-        "zram configurado": "zram configured",
-        "ZRAM ajustado automaticamente:": "ZRAM automatically tuned:",
-        "• Tamanho:": "• Size:",
-        "• Compressão:": "• Compression:",
-        "• vm.swappiness:": "• vm.swappiness:",
-        "Estado atual (swapon --show):": "Current state (swapon --show):",
-    }
-}
+UI_LANG = _detect_ui_lang()
 
-# I18N extra (PT→EN) para fluxo Flatpak/Flathub e submenu Repositórios
-_TRANSL["en"].update({
+# Traduções PT→EN: a chave SEMPRE é o texto original em PT.
+# Dicionário único (sem .update() posteriores), com chaves/valores internados
+# para que as buscas de T() comparem por identidade.
+_EN_MAP: Dict[str, str] = {
+    # Cabeçalho / geral
+    "Um HUB de ferramentas e utilitários para jogos no Linux.": "A hub of tools and utilities for gaming on Linux.",
+    "Wiki": "Wiki",
+    "Reportar Bug": "Report a bug",
+    "Sobre": "About",
+    "Página do projeto": "Project page",
+    # Polkit / permissões
+    "Executar tarefas administrativas do GNU/Shark": "Run administrative tasks for GNU/Shark",
+    "Permitir que o GNU Shark execute ações com privilégios administrativas?": "Allow GNU/Shark to perform administrative actions?",
+    # About
+    "Desenvolvido por Gabriel Ruas Santos": "Developed by Gabriel Ruas Santos",
+
+    # Cards e descrições
+    "Drivers": "Drivers",
+    "Otimizações": "Optimizations",
+    "Ferramentas": "Tools",
+    "Extras": "Extras",
+    "Repositórios": "Repositories",
+    "Repositórios adicionais": "Additional repositories",
+    "Drivers e runtimes necessários para sua GPU.": "Drivers and runtimes required for your GPU.",
+    "Ajustes de desempenho para jogos.": "Performance tweaks for gaming.",
+    "Gerenciadores de jogos e utilitários.": "Game launchers and utilities.",
+    "Recursos adicionais e opcionais.": "Additional and optional resources.",
+    "Ajustes de desempenho para melhorar a experiência em jogos.": "Performance tweaks to improve your gaming experience.",
+    "Gerenciadores de jogos e utilitários complementares.": "Game managers and complementary utilities.",
+    "Recursos adicionais e opcionais para usuários avançados.": "Additional and optional resources for advanced users.",
+
+    # Itens e tooltips
+    "Intel Mesa": "Intel Mesa",
+    "NVIDIA Proprietário": "NVIDIA Proprietary",
+    "AMD Mesa/RADV": "AMD Mesa/RADV",
+    "Driver NVIDIA oficial + Vulkan (loader).": "Official NVIDIA driver + Vulkan (loader).",
+    "Drivers Intel (Mesa) + Vulkan (loader e ICD).": "Intel drivers (Mesa) + Vulkan (loader and ICD).",
+    "Drivers AMD (Mesa/RADV) + Vulkan (loader e ICD).": "AMD drivers (Mesa/RADV) + Vulkan (loader and ICD).",
+
+    "GameMode": "GameMode",
+    "Ativa otimizações de performance enquanto joga": "Enables performance optimizations while gaming",
+    "Tuned": "Tuned",
+    "Perfis automáticos de performance e economia de energia": "Automatic performance and power-saving profiles",
+    "cpupower": "cpupower",
+    "Ajusta frequência e modos de energia da CPU": "Adjust CPU frequency and power modes",
+    "Zram": "Zram",
+    "Configurar compressão de memória RAM para melhorar desempenho": "Configure compressed RAM (zram) to improve performance",
+    "Preload": "Preload",
+    "Daemon que pré-carrega apps para abrir mais rápido": "Daemon that preloads apps to open faster",
+
+    "Steam": "Steam",
+    "Cliente oficial de jogos": "Official game client",
+    "Lutris": "Lutris",
+    "Gerenciador de jogos para rodar títulos nativos, Wine e emuladores": "Game manager for native titles, Wine and emulators",
+    "Heroic": "Heroic",
+    "Cliente alternativo para Epic Games Store e GOG": "Alternative client for Epic Games Store and GOG",
+    "ProtonPlus": "ProtonPlus",
+    "Gerenciador de versões do ProtonGE para compatibilidade de jogos": "ProtonGE versions manager for game compatibility",
+    "Wine": "Wine",
+    "Camada de compatibilidade para rodar aplicativos do Windows": "Compatibility layer to run Windows applications",
+    "Bottles": "Bottles",
+    "Gerenciador de aplicações e jogos Windows em garrafas Wine isoladas": "Manager for Windows apps/games in isolated Wine bottles",
+    "MangoHUD": "MangoHUD",
+    "Exibe FPS e métricas de desempenho durante os jogos": "Display FPS and performance metrics in-game",
+    "Steam Acolyte": "Steam Acolyte",
+    "Ferramenta CLI para configurar multiplas contas Steam": "CLI tool to manage multiple Steam accounts",
+
+    "Goverlay": "Goverlay",
+    "Interface gráfica para MangoHUD e afins": "GUI for MangoHUD and related tools",
+    "Python Steam": "Python Steam",
+    "Biblioteca Python para API do Steam": "Python library for the Steam API",
+    "CoreCtrl (AMD)": "CoreCtrl (AMD)",
+    "Controle avançado de GPU/CPU AMD com perfis de energia": "Advanced AMD GPU/CPU control with power profiles",
+    "GWE (NVIDIA)": "GWE (NVIDIA)",
+    "GreenWithEnvy: Monitorar e controlar GPU NVIDIA (clocks, temperatura, ventoinha)": "GreenWithEnvy: Monitor and control NVIDIA GPU (clocks, temperature, fan)",
+    "AdwSteamGtk": "AdwSteamGtk",
+    "Deixa o Steam no visual GNOME/libadwaita": "Give Steam a GNOME/libadwaita look",
+
+    # Diálogos / botões comuns
+    "Instalação": "Installation",
+    "Cancelar": "Cancel",
+    "OK": "OK",
+    "Abrir": "Open",
+    "Abrir {label} agora?": "Open {label} now?",
+    "Confirmar": "Confirm",
+    "Instalar {label} via Flatpak?": "Install {label} via Flatpak?",
+    "Nada a instalar": "Nothing to install",
+    "Não há pacotes pendentes para {label}.": "There are no pending packages for {label}.",
+    "Instalar {pkgs_str}?": "Install {pkgs_str}?",
+    "Processo finalizado.": "Process finished.",
+    # Multilib & AUR
+    "Multilib": "Multilib",
+    "Alguns pacotes 32-bit requerem o repositório [multilib].\n\nAtivar automaticamente e atualizar bancos de dados agora?": "Some 32-bit packages require the [multilib] repository.\n\nEnable it automatically and refresh databases now?",
+    "Ative manualmente em /etc/pacman.conf e rode: sudo pacman -Syy": "Enable it manually in /etc/pacman.conf and run: sudo pacman -Syy",
+    "AUR": "AUR",
+    "Instalação abortada por falta de helper AUR.": "Installation aborted due to missing AUR helper.",
+    "AUR helper ausente": "Missing AUR helper",
+    # Execução/headless
+    "Concluído (modo sem terminal)": "Completed (headless mode)",
+    "Execução finalizada.\nLog salvo em: {log_path}\n\nVocê pode abrir o arquivo de log para detalhes.": "Execution finished.\nLog saved at: {log_path}\n\nYou can open the log file for details.",
+    "Falha na execução": "Execution failure",
+    "Falha ao abrir": "Failed to open",
+    "Não foi possível iniciar '{exe}'.\n\n{e}": "Could not start '{exe}'.\n\n{e}",
+    "Não foi possível construir o script de instalação (helper AUR ausente?).": "Couldn't build the installation script (missing AUR helper?).",
+    # Hardware incompatível
+    "Hardware incompatível": "Incompatible hardware",
+    "Não detectei GPU NVIDIA neste sistema. Instalação do driver NVIDIA foi bloqueada.": "No NVIDIA GPU detected on this system. NVIDIA driver installation was blocked.",
+    "Processador AMD detectado e nenhuma GPU Intel identificada. Instalação de drivers Intel foi bloqueada.": "AMD CPU detected and no Intel GPU identified. Intel driver installation was blocked.",
+    "Não detectei GPU Intel neste sistema. Instalação de drivers Intel foi bloqueada.": "No Intel GPU detected on this system. Intel driver installation was blocked.",
+    "Não detectei GPU AMD neste sistema. Instalação de drivers AMD foi bloqueada.": "No AMD GPU detected on this system. AMD driver installation was blocked.",
+    # Kernel headers / NVIDIA flow
+    "Atenção": "Attention",
+    "Instale os headers do kernel e tente novamente para usar nvidia-dkms.": "Install kernel headers and try again to use nvidia-dkms.",
+    "Headers do kernel": "Kernel headers",
+    "Kernel atual: {ver}\nPara compilar módulos DKMS (ex.: nvidia-dkms) é recomendado instalar {cand}.\n\nInstalar agora?": "Current kernel: {ver}\nTo build DKMS modules (e.g., nvidia-dkms) it's recommended to install {cand}.\n\nInstall now?",
+    "Instalação de {cand} iniciada. Assim que concluir, volte e tente novamente.": "Installation of {cand} started. Once finished, come back and try again.",
+    "NVIDIA: regenerar initramfs": "NVIDIA: regenerate initramfs",
+    "Detectei o driver NVIDIA carregado.\nRegenerar initramfs agora com {tool}?": "NVIDIA driver seems loaded.\nRegenerate initramfs now with {tool}?",
+    "Reiniciar": "Reboot",
+    "Reiniciar o sistema agora?": "Reboot the system now?",
+    # Pós-instalação / info
+    "Serviço ativado.\n\nResultado do teste:\n{out}": "Service enabled.\n\nTest result:\n{out}",
+    "zram configurado": "zram configured",
+    "ZRAM ajustado automaticamente:": "ZRAM automatically tuned:",
+    "• Tamanho:": "• Size:",
+    "• Compressão:": "• Compression:",
+    "• vm.swappiness:": "• vm.swappiness:",
+    "Estado atual (swapon --show):": "Current state (swapon --show):",
+    "Detectando hardware…": "Detecting hardware…",
+
+    # Fluxo Flatpak/Flathub e submenu Repositórios
     "Flathub Ativo": "Flathub Active",
     "O suporte a flatpak já está habilitado em seu sistema.": "Flatpak support is already enabled on your system.",
     "Ativar o suporte a Flatpak e adicionar o repositório Flathub agora?": "Enable Flatpak support and add the Flathub repository now?",
     "Ativar o repositório Flathub agora?": "Enable the Flathub repository now?",
     "Configuração do Flatpak": "Flatpak setup",
     "Configuração do Flathub": "Flathub setup",
-
-    "Repositórios": "Repositories",
     "Flathub": "Flathub",
-    "Repositórios adicionais": "Additional repositories",
     "Uma seleção de repositórios adicionais.": "A selection of additional repositories.",
     "Repositório essencial para aplicativos flatpak": "Essential repository for Flatpak apps",
-
     "Fontes de software e repositórios.": "Software sources and repositories.",
     "Ativar/gerenciar o repositório Flathub": "Enable/manage the Flathub repository",
-})
 
-# Traduções faltantes adicionadas
-_TRANSL["en"].update({
+    # Wine / GStreamer
     "Instalar suporte multimídia (GStreamer) para o Wine?": "Install multimedia support (GStreamer) for Wine?",
-})
+}
+_EN_MAP = {sys.intern(k): sys.intern(v) for k, v in _EN_MAP.items()}
 
-def T(pt_text: str, **fmt) -> str:
-    """
-    Traduz PT→EN quando necessário. Placeholders via .format(**fmt).
+# Layout "struct of arrays" para T(): índice PT→posição + tupla contígua de valores EN
+_EN_KEYS: Tuple[str, ...] = tuple(_EN_MAP.keys())
+_EN_VALS: Tuple[str, ...] = tuple(_EN_MAP.values())
+_EN_IDX: Dict[str, int] = {k: i for i, k in enumerate(_EN_KEYS)}
+# str.format já ligado para os valores com placeholders; None = texto fixo (sem .format)
+_EN_FMT: Tuple[Optional[Callable[..., str]], ...] = tuple(v.format if "{" in v else None for v in _EN_VALS)
 
-    Observação:
-    - Se a chave não existir no dicionário em EN, cai no texto PT e loga em DEBUG.
-    - Se a função receber um texto já em EN (por chamadas encadeadas), ela o retorna como veio.
-    """
-    if UI_LANG == "pt":
-        return pt_text.format(**fmt) if fmt else pt_text
-    d = _TRANSL.get("en", {})
-    txt = d.get(pt_text, pt_text)
-    if txt == pt_text:  # loga chaves PT que não têm tradução
+
+def _t_pt(pt_text: str, **fmt) -> str:
+    """Tradutor para UI em PT: devolve o próprio texto (com placeholders)."""
+    return pt_text.format(**fmt) if fmt and "{" in pt_text else pt_text
+
+
+def _t_en(pt_text: str, **fmt) -> str:
+    """Tradutor PT→EN; chaves ausentes caem no texto PT."""
+    i = _EN_IDX.get(pt_text)
+    if i is None:
+        return pt_text.format(**fmt) if fmt and "{" in pt_text else pt_text
+    f = _EN_FMT[i]
+    return f(**fmt) if fmt and f is not None else _EN_VALS[i]
+
+
+def _t_en_debug(pt_text: str, **fmt) -> str:
+    """Como _t_en, mas loga em DEBUG as chaves PT sem tradução."""
+    if pt_text not in _EN_IDX:
         LOG.debug("i18n: missing key for en: %r", pt_text)
-    return txt.format(**fmt) if fmt else txt
+    return _t_en(pt_text, **fmt)
+
+
+# T(pt_text, **fmt): traduz PT→EN quando necessário. Placeholders via .format(**fmt).
+# O tradutor é escolhido uma única vez no import (idioma não muda em runtime);
+# o log de chaves ausentes só é ativado em DEBUG (GNUSK_DEBUG=1).
+# Textos já em EN (chamadas encadeadas) são devolvidos como vieram.
+if UI_LANG == "pt":
+    T = _t_pt
+elif LOG.isEnabledFor(logging.DEBUG):
+    T = _t_en_debug
+else:
+    T = _t_en
+
+
+# Rótulos de seção resolvidos uma vez (reusados a cada reconstrução de cards/submenus)
+L_DRIVERS = T("Drivers")
+L_DRIVERS_DESC = T("Drivers e runtimes necessários para sua GPU.")
+L_OPT = T("Otimizações")
+L_TOOLS = T("Ferramentas")
+L_EXTRAS = T("Extras")
+L_REPOS = T("Repositórios")
+L_REPOS_ADD = T("Repositórios adicionais")
+
+# Diálogo de zram: rótulos traduzidos embutidos uma vez; só os valores entram no .format
+L_ZRAM_TITLE = T("zram configurado")
+_ZRAM_MSG_TMPL = (
+    f"{T('ZRAM ajustado automaticamente:')}\n"
+    f"{T('• Tamanho:')} {{size}}\n"
+    f"{T('• Compressão:')} {{comp}}\n"
+    f"{T('• vm.swappiness:')} {{swap}}\n\n"
+    f"{T('Estado atual (swapon --show):')}\n{{swapon}}"
+)
 
 
 # =============================================================================
 # Constantes / Paths / Theme
 # =============================================================================
 
-APP_TITLE = "GNU/Shark"
-APP_SUBTITLE = "Um HUB de ferramentas e utilitários para jogos no Linux."
-APP_VERSION = "1.0.0"  # <<< NOVO: versão exibida no diálogo Sobre e usada no CLI --version
+# APP_TITLE / APP_VERSION ficam no bloco do CLI (usados antes do GTK carregar)
+APP_SUBTITLE = sys.intern("Um HUB de ferramentas e utilitários para jogos no Linux.")  # chave de _EN_MAP
+L_APP_SUBTITLE = T(APP_SUBTITLE)
 
 # App ID e nome do ícone (deve casar com o .desktop)
 APP_ID = "org.gnushark.GNUShark"
@@ -341,9 +482,13 @@ XDG_CONFIG_HOME = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"
 CONFIG_DIR = XDG_CONFIG_HOME / "gnushark"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
+# Cache (dados descartáveis, refeitos a qualquer momento; fora da config do usuário)
+XDG_CACHE_HOME = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+CACHE_DIR = XDG_CACHE_HOME / "gnushark"
+
 # Icons
 ICONS_DIR_NAME = "icons"
-ICON_EXTS = (".svg", ".png", ".xpm")
+ICON_EXTS: Tuple[str, ...] = tuple(map(sys.intern, (".svg", ".png", ".xpm")))
 ENABLE_ICON_RGLOB = os.environ.get("GNUSK_ICON_RGLOB", "0") == "1"
 
 # Polkit
@@ -351,57 +496,76 @@ RUNROOT_POLICY_ID = "org.gnushark.runroot"
 RUNROOT_WRAPPER_PATH = "/usr/libexec/gnushark-runroot"
 RUNROOT_POLICY_PATH = f"/usr/share/polkit-1/actions/{RUNROOT_POLICY_ID}.policy"
 
+# Classes CSS usadas pelos widgets (internadas uma vez; também montam o CSS abaixo)
+CLS_CARD_BTN = sys.intern("card-btn")
+CLS_HEADER = sys.intern("header")
+CLS_HEADER_TITLE = sys.intern("header-title")
+CLS_HEADER_SUBTITLE = sys.intern("header-subtitle")
+CLS_FOOTER = sys.intern("footer")
+CLS_ROW = sys.intern("row")
+CLS_BTN_LABEL = sys.intern("btn-label")
+
 # CSS (subtítulo 12pt)
-CSS = """
-window { background-color: #2b2a33; color: #e6e6e6; font-family: "Inter","Ubuntu","Cantarell",sans-serif; font-size: 11pt; }
-.header { padding: 18px 18px 8px 18px; }
-.header-title { font-weight: 700; font-size: 18pt; }
-.header-subtitle { opacity: 0.85; font-size: 12pt; }
-.card-btn { background-color:#3a3946; border-radius:18px; padding:14px; }
-.card-btn:hover { background-color:#434255; } .card-btn:active{ background-color:#313041; }
-.row { margin: 6px 0; }
-.btn-label { font-weight: 700; font-size: 15pt; }
-.footer { padding: 8px 14px 14px 14px; border-top-width: 1px; border-top-style: solid; border-top-color: rgba(255,255,255,0.08); }
-.section { padding: 8px 14px 0 14px; opacity: 0.9; }
+CSS = f"""
+window {{ background-color: #2b2a33; color: #e6e6e6; font-family: "Inter","Ubuntu","Cantarell",sans-serif; font-size: 11pt; }}
+.{CLS_HEADER} {{ padding: 18px 18px 8px 18px; }}
+.{CLS_HEADER_TITLE} {{ font-weight: 700; font-size: 18pt; }}
+.{CLS_HEADER_SUBTITLE} {{ opacity: 0.85; font-size: 12pt; }}
+.{CLS_CARD_BTN} {{ background-color:#3a3946; border-radius:18px; padding:14px; }}
+.{CLS_CARD_BTN}:hover {{ background-color:#434255; }} .{CLS_CARD_BTN}:active{{ background-color:#313041; }}
+.{CLS_ROW} {{ margin: 6px 0; }}
+.{CLS_BTN_LABEL} {{ font-weight: 700; font-size: 15pt; }}
+.{CLS_FOOTER} {{ padding: 8px 14px 14px 14px; border-top-width: 1px; border-top-style: solid; border-top-color: rgba(255,255,255,0.08); }}
+.section {{ padding: 8px 14px 0 14px; opacity: 0.9; }}
 """
+CSS_BYTES = CSS.encode("utf-8")
 
 # =============================================================================
-# EXPECT + helpers shell
+# Helpers shell
 # =============================================================================
-EXPECT_FUNC = r"""
-expect_yes_pac() {
+
+# expect_yes_pac "<cmd>": roda <cmd> (pode referenciar run_root/run_root_sh, exportados
+# via `export -f`) através de auto_answer() deste mesmo script, sem depender de `expect`.
+EXPECT_FUNC = f"""
+expect_yes_pac() {{
   set -o pipefail
-  # $1 = comando a ser rodado (pode referenciar run_root/run_root_sh)
-  if command -v expect >/dev/null 2>&1; then
-    expect -c '
-      set timeout -1
-      set cmd [lindex $argv 0]
-      # Força locale C para estabilizar prompts
-      spawn env LC_ALL=C bash -lc "$cmd"
-      puts ">>> running: $cmd"
-      expect {
-        # Confirmar apenas operações de instalação/continuidade/substituição
-        -re {(?i)(::\s*)?(Proceed|Install|Continue|Replace)[^?\n]*\?} { send "y\r"; exp_continue }
-        -re {(?i)(::\s*)?Import[^.\n]*PGP[^?\n]*\?} { send "y\r"; exp_continue }
-        # Nunca confirmar remoções automaticamente
-        -re {(?i)\b(Remove|Remover)\b[^?\n]*\?} { send "n\r"; exp_continue }
-        # Prompts em PT (sim): Deseja/Continuar/Substituir/Conflit(o)
-        -re {(?i)(Deseja|Continuar|Substituir|Conflit)[^?\n]*\?} { send "s\r"; exp_continue }
-        -re {(?i)press[^\n]*enter[^\n]*continue} { send "\r"; exp_continue }
-        eof
-      }
-    ' "$1"
-  else
-    _cmd="$1"
-    _first="$(printf "%s" "$_cmd" | awk '{print $1}')"
-    case "$_first" in
-      pacman|pamac) yes | env LC_ALL=C bash -lc "$_cmd" ;;
-      *)            eval "$_cmd" ;;
-    esac
-  fi
-}
+  {shlex.quote(sys.executable)} {shlex.quote(os.path.abspath(__file__))} --auto-answer "$1"
+}}
 """.strip()
 
+# Askpass gráfico do sudo (lido uma vez; o ambiente não muda durante a execução)
+SUDO_ASKPASS = os.environ.get("SUDO_ASKPASS", "")
+_SUDO_FLAGS = "-A -k" if SUDO_ASKPASS else "-k"
+
+# run_root/run_root_sh por modo de elevação
+_RUN_ROOT_DEFS: Mapping[str, str] = MappingProxyType({
+    "root-euid0": r"""
+run_root() { env PATH="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin" bash -lc "$1"; }
+run_root_sh() { env PATH="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin" bash -lc "$(cat)"; }
+export -f run_root run_root_sh
+""".strip(),
+    "root-pkexec": fr"""
+run_root() {{ printf '%s\n' "$1" | pkexec {RUNROOT_WRAPPER_PATH}; }}
+run_root_sh() {{ pkexec {RUNROOT_WRAPPER_PATH}; }}
+export -f run_root run_root_sh
+""".strip(),
+    "root-sudo": f"""
+run_root() {{ sudo {_SUDO_FLAGS} bash -lc "$1"; }}
+run_root_sh() {{ sudo {_SUDO_FLAGS} bash -lc "$(cat)"; }}
+export -f run_root run_root_sh
+""".strip(),
+    "user": r"""
+run_root() { bash -lc "$1"; }
+run_root_sh() { bash -lc "$(cat)"; }
+export -f run_root run_root_sh
+""".strip(),
+})
+
+@lru_cache(maxsize=4)
+def _script_prefix(run_mode: str) -> str:
+    """Cabeçalho comum dos pipelines (set -e + expect_yes_pac + run_root do modo)."""
+    return " ; ".join(("set -e", EXPECT_FUNC, _RUN_ROOT_DEFS[run_mode])) + " ; set -o pipefail ; "
+
 
 # =============================================================================
 # Util: Diretórios, Tema e Ícones
@@ -417,25 +581,45 @@ APP_DIR: Path = app_dir()
 _ICONS_ENV = os.environ.get("GNUSK_ICONS_DIR")
 ICONS_DIR: Path = Path(_ICONS_ENV) if _ICONS_ENV else (APP_DIR / ICONS_DIR_NAME)
 
+_CSS_PROVIDER: Optional[Gtk.CssProvider] = None
+
 def add_css() -> None:
-    """Carrega o CSS custom do app."""
-    prov = Gtk.CssProvider()
-    prov.load_from_data(CSS.encode("utf-8"))
+    """Carrega o CSS custom do app (parse único; chamadas seguintes não fazem nada)."""
+    global _CSS_PROVIDER
+    if _CSS_PROVIDER is not None:
+        return
+    _CSS_PROVIDER = Gtk.CssProvider()
+    _CSS_PROVIDER.load_from_data(CSS_BYTES)
     Gtk.StyleContext.add_provider_for_screen(
-        Gdk.Screen.get_default(), prov, Gtk.STYLE_PROVIDER_PRIORITY_USER
+        Gdk.Screen.get_default(), _CSS_PROVIDER, Gtk.STYLE_PROVIDER_PRIORITY_USER
     )
 
+def _add_class(widget: Gtk.Widget, *classes: str) -> None:
+    """Adiciona classes CSS com um único get_style_context()."""
+    sc = widget.get_style_context()
+    for cls in classes:
+        sc.add_class(cls)
+
+_ICON_THEME_READY = False
+
 def init_icon_theme() -> None:
-    """Inclui o diretório de ícones custom no tema atual."""
+    """Inclui o diretório de ícones custom no tema atual (uma vez por processo)."""
+    global _ICON_THEME_READY
+    if _ICON_THEME_READY:
+        return
     theme = Gtk.IconTheme.get_default()
     theme.append_search_path(str(ICONS_DIR))
+    theme.connect("changed", lambda *_a: _clear_icon_caches())
+    _clear_icon_caches()
+    build_icon_index()
+    _ICON_THEME_READY = True
 
 class IconCategory(Enum):
     APPS = "apps"; DEVICES = "devices"; MIMETYPES = "mimetypes"; STATUS = "status"
     ACTIONS = "actions"; CATEGORIES = "categories"; PREFERENCES = "preferences"; PLACES = "places"
 
-ICON_SIZES: Tuple[str, ...] = ("16x16","22x22","24x24","32x32","48x48","64x64","96x96","128x128","256x256","scalable")
-ICON_CATEGORIES: Tuple[str, ...] = tuple(c.value for c in IconCategory)
+ICON_SIZES: Tuple[str, ...] = tuple(map(sys.intern, ("16x16","22x22","24x24","32x32","48x48","64x64","96x96","128x128","256x256","scalable")))
+ICON_CATEGORIES: Tuple[str, ...] = tuple(sys.intern(c.value) for c in IconCategory)
 
 ICON_ALIASES: Dict[str, str] = {
     "drivers": "drivers", "opt": "opt", "tools": "tools",
@@ -448,42 +632,97 @@ ICON_ALIASES: Dict[str, str] = {
     "flathub": "flathub",
     "repository": "repository",
 }
+ICON_ALIASES = {sys.intern(k): sys.intern(v) for k, v in ICON_ALIASES.items()}
+
+# Índice nome→arquivo dos ícones locais (montado uma vez por os.walk em ICONS_DIR)
+_ICON_INDEX: Dict[str, Path] = {}
+_ICON_INDEX_READY = False
+
+# Produto (tamanho, categoria, extensão) pré-computado na ordem de prioridade da busca
+_ICON_TRIPLES: Tuple[Tuple[str, str, str], ...] = tuple(
+    (sz, cat, ext) for sz in ICON_SIZES for cat in ICON_CATEGORIES for ext in ICON_EXTS
+)
+_ICON_TRIPLE_RANK: Dict[Tuple[str, str, str], int] = {t: i for i, t in enumerate(_ICON_TRIPLES)}
+_ICON_EXT_RANK: Dict[str, int] = {ext: i for i, ext in enumerate(ICON_EXTS)}
+
+def _icon_rank(rel_parts: Tuple[str, ...], ext: str) -> Tuple[int, int]:
+    """Prioridade de um arquivo: raiz > <tamanho>/<categoria> (na ordem de _ICON_TRIPLES) > resto."""
+    if not rel_parts:
+        return (0, _ICON_EXT_RANK[ext])
+    if len(rel_parts) == 2:
+        r = _ICON_TRIPLE_RANK.get((rel_parts[0], rel_parts[1], ext))
+        if r is not None:
+            return (1, r)
+    return (2, _ICON_EXT_RANK[ext])
+
+def build_icon_index() -> None:
+    """Varre ICONS_DIR uma única vez e preenche _ICON_INDEX (idempotente)."""
+    global _ICON_INDEX_READY
+    if _ICON_INDEX_READY:
+        return
+    best: Dict[str, Tuple[Tuple[int, int], Path]] = {}
+    base = str(ICONS_DIR)
+    for dirpath, _dirs, files in os.walk(base):
+        rel = os.path.relpath(dirpath, base)
+        rel_parts = () if rel == "." else tuple(rel.split(os.sep))
+        for f in files:
+            stem, ext = os.path.splitext(f)
+            ext = ext.lower()
+            if ext not in ICON_EXTS:
+                continue
+            rank = _icon_rank(rel_parts, ext)
+            if rank[0] == 2 and not ENABLE_ICON_RGLOB:
+                continue
+            cur = best.get(stem)
+            if cur is None or rank < cur[0]:
+                best[sys.intern(stem)] = (rank, Path(dirpath) / f)
+    _ICON_INDEX.clear()
+    _ICON_INDEX.update((stem, path) for stem, (_rank, path) in best.items())
+    _ICON_INDEX_READY = True
 
-@lru_cache(maxsize=256)
 def find_local_icon_file(name: str) -> Optional[Path]:
-    """Procura um ícone local por nome/alias nas pastas do tema do app."""
+    """Procura um ícone local por nome/alias no índice das pastas do tema do app."""
     if not name:
         return None
+    if not _ICON_INDEX_READY:
+        build_icon_index()
     key = ICON_ALIASES.get(name, name)
-    for ext in ICON_EXTS:
-        direct = ICONS_DIR / f"{key}{ext}"
-        if direct.exists():
-            return direct
-    for size in ICON_SIZES:
-        for cat in ICON_CATEGORIES:
-            for ext in ICON_EXTS:
-                candidate = ICONS_DIR / size / cat / f"{key}{ext}"
-                if candidate.exists():
-                    return candidate
-    if ENABLE_ICON_RGLOB and ICONS_DIR.exists():
-        for path in ICONS_DIR.rglob(f"{key}*"):
-            if path.suffix.lower() in ICON_EXTS and path.is_file():
+    found = _ICON_INDEX.get(key)
+    if found is None and ENABLE_ICON_RGLOB:
+        for stem, path in _ICON_INDEX.items():
+            if stem.startswith(key):
                 return path
-    return None
+    return found
 
+@lru_cache(maxsize=256)
+def _has_icon(name: str) -> bool:
+    """Theme.has_icon memoizado (limpo quando o tema muda)."""
+    theme = Gtk.IconTheme.get_default()
+    return bool(theme and theme.has_icon(name))
+
+@lru_cache(maxsize=256)
 def icon_name_or_fallback(name: str, fallback: str = "applications-system") -> str:
     """Resolve ícone local/tema; retorna fallback se não encontrado."""
-    theme = Gtk.IconTheme.get_default()
     local = find_local_icon_file(name)
     if local:
         return str(local)
-    if theme and theme.has_icon(name):
+    if _has_icon(name):
         return name
     alias = ICON_ALIASES.get(name)
-    if alias and theme and theme.has_icon(alias):
+    if alias and _has_icon(alias):
         return alias
     return fallback
 
+def _clear_icon_caches() -> None:
+    """Invalida os caches que dependem do tema de ícones."""
+    _has_icon.cache_clear()
+    icon_name_or_fallback.cache_clear()
+
+@lru_cache(maxsize=256)
+def _pixbuf_at_scale(path: str, px: int) -> GdkPixbuf.Pixbuf:
+    """Decodifica (e rasteriza SVG) uma única vez por (arquivo, tamanho); Pixbuf é imutável."""
+    return GdkPixbuf.Pixbuf.new_from_file_at_scale(path, px, px, True)
+
 def build_icon(icon_ref: str, px: int) -> Gtk.Image:
     """Cria Gtk.Image a partir de arquivo local (escalado) ou nome de ícone do tema."""
     try:
@@ -493,12 +732,11 @@ def build_icon(icon_ref: str, px: int) -> Gtk.Image:
             local = direct if direct.exists() else find_local_icon_file(icon_ref)
         if local:
             try:
-                pb = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(local), px, px, True)
-                return Gtk.Image.new_from_pixbuf(pb)
+                return Gtk.Image.new_from_pixbuf(_pixbuf_at_scale(str(local), px))
             except Exception:
                 return Gtk.Image.new_from_file(str(local))
-        name = icon_name_or_fallback(icon_ref)
-        img = Gtk.Image.new_from_icon_name(name, Gtk.IconSize.DIALOG)
+        # Por nome: o GTK resolve no tema (escala HiDPI, simbólicos, troca de tema)
+        img = Gtk.Image.new_from_icon_name(icon_name_or_fallback(icon_ref), Gtk.IconSize.DIALOG)
         img.set_pixel_size(px)
         return img
     except Exception:
@@ -536,22 +774,78 @@ def _bootstrap_app_identity() -> None:
 # Persistência
 # =============================================================================
 
-def load_state() -> Dict:
-    """Carrega estado do app (JSON) se existir."""
+def json_loads(data: bytes) -> object:
+    """Decodifica JSON (orjson quando disponível)."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def json_dumps(obj: object) -> bytes:
+    """Codifica JSON indentado em UTF-8 (orjson quando disponível)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Grava em arquivo temporário e troca via os.replace (nunca deixa JSON pela metade)."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def file_has_content(path: str, text: str) -> bool:
+    """True se o arquivo existe e tem exatamente esse texto (leitura em processo, sem cmp)."""
     try:
-        if CONFIG_FILE.exists():
-            return json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read() == text
     except Exception:
-        pass
-    return {}
+        return False
+
+_CONFIG_DIR_READY = False
+
+def ensure_config_dir() -> None:
+    """Cria CONFIG_DIR na primeira vez que for preciso (sem mkdir a cada gravação)."""
+    global _CONFIG_DIR_READY
+    if not _CONFIG_DIR_READY:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _CONFIG_DIR_READY = True
+
+_CACHE_DIR_READY = False
+
+def ensure_cache_dir() -> None:
+    """Cria CACHE_DIR na primeira vez que for preciso."""
+    global _CACHE_DIR_READY
+    if not _CACHE_DIR_READY:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _CACHE_DIR_READY = True
+
+# Espelho em memória do config.json (evita reler o arquivo a cada load_state)
+_STATE: Optional[Dict] = None
+
+def load_state() -> Dict:
+    """Carrega estado do app (JSON) se existir."""
+    global _STATE
+    if _STATE is None:
+        _STATE = {}
+        try:
+            data = json_loads(CONFIG_FILE.read_bytes())
+            if isinstance(data, dict):
+                _STATE = data
+        except Exception:
+            pass
+    return dict(_STATE)
 
 def save_state(data: Dict) -> None:
     """Salva estado do app (JSON)."""
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    CONFIG_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    global _STATE
+    ensure_config_dir()
+    write_atomic(CONFIG_FILE, json_dumps(data))
+    _STATE = dict(data)
 
 def clean_legacy_state() -> None:
-    """Remove chaves legadas do estado."""
+    """Remove chaves legadas do estado (e os caches antigos que ficavam na config)."""
+    for name in ("official_repos.json", "hardware.json"):
+        try:
+            (CONFIG_DIR / name).unlink()
+        except OSError:
+            pass
     st = load_state(); changed = False
     for key in ("repos", "pick"):
         if key in st:
@@ -564,42 +858,95 @@ def clean_legacy_state() -> None:
 # Distro / PKG manager
 # =============================================================================
 
-def detect_distro() -> Tuple[str, str]:
-    """Retorna (id, nome legível) da distro."""
-    distro_id = ""; id_like = ""; pretty = ""
+@dataclass(frozen=True)
+class OsRelease:
+    id: str
+    id_like: str
+    pretty: str
+
+@lru_cache(maxsize=1)
+def _os_release() -> OsRelease:
+    """Lê /etc/os-release uma vez, parando assim que as chaves necessárias forem vistas."""
+    wanted = {"ID", "ID_LIKE", "PRETTY_NAME", "NAME"}
+    out: Dict[str, str] = {}
     try:
-        kv = dict(
-            (k.strip(), v.strip().strip('"'))
-            for k, v in (
-                line.split("=", 1)
-                for line in Path("/etc/os-release").read_text(encoding="utf-8").splitlines()
-                if "=" in line
-            )
-        )
-        distro_id = kv.get("ID", "").lower()
-        id_like = kv.get("ID_LIKE", "").lower()
-        pretty = kv.get("PRETTY_NAME", kv.get("NAME", ""))
+        for line in Path("/etc/os-release").read_text(encoding="utf-8", errors="ignore").splitlines():
+            if "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            k = k.strip()
+            if k in wanted:
+                out[k] = v.strip().strip('"')
+                if len(out) == len(wanted):
+                    break
     except Exception:
         pass
+    return OsRelease(
+        id=out.get("ID", "").lower(),
+        id_like=out.get("ID_LIKE", "").lower(),
+        pretty=out.get("PRETTY_NAME", out.get("NAME", "")),
+    )
+
+# (token em ID/ID_LIKE, id retornado, nome padrão) em ordem de prioridade; Arch é o fallback
+_DISTRO_TOKENS: Tuple[Tuple[str, str, str], ...] = (
+    ("cachyos", "cachyos", "CachyOS"),
+    ("biglinux", "biglinux", "BigLinux"),
+    ("manjaro", "manjaro", "Manjaro"),
+)
 
-    def has(tok: str) -> bool:
-        return tok in distro_id or tok in id_like
+@lru_cache(maxsize=1)
+def detect_distro() -> Tuple[str, str]:
+    """Retorna (id, nome legível) da distro."""
+    osr = _os_release()
+    distro_id, id_like, pretty = osr.id, osr.id_like, osr.pretty
 
-    if has("cachyos"):
-        return "cachyos", pretty or "CachyOS"
-    if has("biglinux"):
-        return "biglinux", pretty or "BigLinux"
-    if has("manjaro"):
-        return "manjaro", pretty or "Manjaro"
+    ids = f"{distro_id} {id_like}"
+    for tok, did, name in _DISTRO_TOKENS:
+        if tok in ids:
+            return did, pretty or name
     if distro_id == "arch" or "arch" in id_like:
         return "arch", pretty or "Arch Linux"
     return "unknown", pretty or "Linux"
 
 
+@lru_cache(maxsize=None)
+def _which(name: str) -> Optional[str]:
+    """shutil.which memoizado; limpo ao fim de cada instalação (binários novos no PATH)."""
+    return shutil.which(name)
+
+@dataclass(frozen=True)
+class Capabilities:
+    """Ferramentas opcionais presentes no PATH."""
+    mkinitcpio: bool
+    dracut: bool
+    pkexec: bool
+    paru: bool
+    yay: bool
+    pamac: bool
+    flatpak: bool
+
+    @property
+    def aur_helper(self) -> Optional[str]:
+        return "paru" if self.paru else "yay" if self.yay else None
+
+@lru_cache(maxsize=1)
+def detect_caps() -> Capabilities:
+    """Uma passada de _which pelas ferramentas opcionais (refeita ao fim de cada instalação)."""
+    return Capabilities(**{f.name: _which(f.name) is not None for f in fields(Capabilities)})
+
+def spawn(argv: Sequence[str], **kwargs: object) -> subprocess.Popen:
+    """Popen pelo caminho posix_spawn do CPython (executável absoluto, close_fds=False).
+
+    Evita o fork() de um processo GTK grande; os fds do Python já nascem não-herdáveis (PEP 446).
+    """
+    exe = _which(argv[0]) or argv[0]
+    return subprocess.Popen([exe, *argv[1:]], close_fds=False, **kwargs)
+
+@lru_cache(maxsize=1)
 def pick_pkg_manager() -> Optional[str]:
     """Retorna primeiro gerenciador encontrado dentre pamac/pacman/paru/yay."""
     for cand in ("pamac", "pacman", "paru", "yay"):
-        if shutil.which(cand):
+        if _which(cand):
             return cand
     return None
 
@@ -608,23 +955,24 @@ def pick_pkg_manager() -> Optional[str]:
 # Detecção de hardware
 # =============================================================================
 
-def _run_cmd_get_output(cmd: str) -> str:
-    """Executa comando em shell bash -lc e retorna saída (ou string vazia em erro)."""
+def _run_argv_get_output(argv: Sequence[str]) -> str:
+    """Executa um programa direto (sem shell) e retorna stdout (ou string vazia em erro)."""
     try:
-        return subprocess.check_output(["bash", "-lc", cmd], text=True, stderr=subprocess.DEVNULL)
+        return subprocess.run(list(argv), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True, check=False).stdout
     except Exception:
         return ""
 
+@lru_cache(maxsize=1)
 def detect_cpu_vendor() -> str:
     """Retorna fornecedor de CPU ('intel', 'amd' ou '')."""
     txt = ""
     try:
-        if Path("/proc/cpuinfo").exists():
-            txt = Path("/proc/cpuinfo").read_text(errors="ignore")
+        txt = Path("/proc/cpuinfo").read_text(errors="ignore")
     except Exception:
         pass
     if not txt:
-        txt = _run_cmd_get_output("lscpu || true")
+        txt = _run_argv_get_output(["lscpu"])
     low = txt.lower()
     if "genuineintel" in low or "intel" in low:
         return "intel"
@@ -632,8 +980,23 @@ def detect_cpu_vendor() -> str:
         return "amd"
     return ""
 
+# IDs PCI (sysfs) dos fabricantes de GPU suportados
+GPU_PCI_VENDORS: Dict[str, str] = {"10de": "nvidia", "1002": "amd", "1022": "amd", "8086": "intel"}
+PCI_DEVICES_DIR = Path("/sys/bus/pci/devices")
+
+def _read_sysfs_id(path: Path) -> str:
+    """Lê um ID hexadecimal do sysfs ('0x10de' -> '10de')."""
+    vid = path.read_text().strip().lower()
+    return vid[2:] if vid.startswith("0x") else vid
+
 def _gpu_vendors_from_lspci() -> List[str]:
-    out = _run_cmd_get_output("lspci -nnk | grep -iE 'vga|3d|display' -A2 || true").lower()
+    """Fallback via lspci (apenas se o sysfs não estiver disponível)."""
+    # Equivalente a 'lspci -nnk | grep -iE "vga|3d|display" -A2', filtrado aqui mesmo
+    lines = _run_argv_get_output(["lspci", "-nnk"]).lower().splitlines()
+    out = "\n".join(
+        "\n".join(lines[i:i + 3]) for i, line in enumerate(lines)
+        if "vga" in line or "3d" in line or "display" in line
+    )
     found: List[str] = []
     if "nvidia" in out:
         found.append("nvidia")
@@ -643,164 +1006,338 @@ def _gpu_vendors_from_lspci() -> List[str]:
         found.append("intel")
     return list(dict.fromkeys(found))
 
+def _gpu_vendors_from_pci() -> List[str]:
+    """Vendors das controladoras de vídeo (classe PCI 0x03xxxx) lidos direto do sysfs."""
+    if not PCI_DEVICES_DIR.is_dir():
+        return _gpu_vendors_from_lspci()
+    found: List[str] = []
+    try:
+        for dev in PCI_DEVICES_DIR.iterdir():
+            try:
+                if not _read_sysfs_id(dev / "class").startswith("03"):
+                    continue
+                vendor = GPU_PCI_VENDORS.get(_read_sysfs_id(dev / "vendor"))
+            except OSError:
+                continue
+            if vendor:
+                found.append(vendor)
+    except OSError:
+        return _gpu_vendors_from_lspci()
+    return list(dict.fromkeys(found))
+
 def _gpu_vendors_from_sysfs() -> List[str]:
-    vendors: List[str] = []
+    """Vendors das placas DRM (/sys/class/drm/card*/device/vendor); para ao achar todos."""
+    vendors: Dict[str, None] = {}
+    all_vendors = set(GPU_PCI_VENDORS.values())
     try:
-        drm = Path("/sys/class/drm")
-        if drm.exists():
-            for dev in drm.glob("card*/device/vendor"):
+        with os.scandir("/sys/class/drm") as it:
+            for entry in it:
+                if not entry.name.startswith("card"):
+                    continue
                 try:
-                    vid = dev.read_text().strip().lower()
-                    if vid.startswith("0x"):
-                        vid = vid[2:]
-                    if vid == "10de":
-                        vendors.append("nvidia")
-                    elif vid in ("1002",):
-                        vendors.append("amd")
-                    elif vid == "8086":
-                        vendors.append("intel")
-                except Exception:
-                    pass
-    except Exception:
+                    vendor = GPU_PCI_VENDORS.get(_read_sysfs_id(Path(entry.path, "device", "vendor")))
+                except OSError:
+                    continue
+                if vendor:
+                    vendors[vendor] = None
+                    if len(vendors) == len(all_vendors):
+                        break
+    except OSError:
         pass
-    return list(dict.fromkeys(vendors))
+    return list(vendors)
 
+@lru_cache(maxsize=1)
 def _gpu_modules_present() -> List[str]:
-    out = _run_cmd_get_output("lsmod | awk '{print $1}' | tr '[:upper:]' '[:lower:]'")
+    """Vendors com módulo de kernel de GPU carregado (/proc/modules; lsmod como fallback)."""
+    try:
+        with open("/proc/modules", encoding="utf-8", errors="ignore") as fh:
+            mods = {line.split(" ", 1)[0].lower() for line in fh}
+    except OSError:
+        out = _run_argv_get_output(["lsmod"]).lower()
+        mods = {line.split(None, 1)[0] for line in out.splitlines() if line.strip()}
     vendors: List[str] = []
-    if "nvidia" in out:
+    if "nvidia" in mods:
         vendors.append("nvidia")
-    if "amdgpu" in out or "radeon" in out:
+    if "amdgpu" in mods or "radeon" in mods:
         vendors.append("amd")
-    if "i915" in out:
+    if "i915" in mods:
         vendors.append("intel")
-    return list(dict.fromkeys(vendors))
+    return vendors
 
+@lru_cache(maxsize=1)
 def detect_gpu_vendors() -> List[str]:
-    """Tenta detectar vendors pela ordem: lspci -> sysfs."""
-    vendors = _gpu_vendors_from_lspci()
+    """Tenta detectar vendors pela ordem: PCI (sysfs) -> DRM (sysfs)."""
+    vendors = _gpu_vendors_from_pci()
     if not vendors:
         vendors = _gpu_vendors_from_sysfs()
     return vendors
 
+@lru_cache(maxsize=1)
+def total_ram_mib() -> int:
+    """RAM total em MiB (MemTotal de /proc/meminfo, procurado direto nos bytes)."""
+    try:
+        with open("/proc/meminfo", "rb", buffering=0) as f:
+            data = f.read(2048)
+        i = data.find(b"MemTotal:")
+        if i >= 0:
+            return int(data[i + 9:data.find(b"\n", i)].split()[0]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 4096
+
+@lru_cache(maxsize=1)
+def cpu_count() -> int:
+    """Número de CPUs (os.cpu_count: um sysconf, sem fork do nproc)."""
+    return os.cpu_count() or 1
+
+@lru_cache(maxsize=1)
+def kernel_variant() -> str:
+    """Release do kernel (uname -r) em minúsculas."""
+    return os.uname().release.lower()
+
+# Cache em disco da detecção (invalidado por troca de kernel, versão do app ou TTL)
+HW_CACHE_FILE = CACHE_DIR / "hardware.json"
+HW_CACHE_TTL_S = int(os.environ.get("GNUSK_HW_CACHE_TTL", str(24 * 60 * 60)))
+
+def load_hw_cache() -> Dict:
+    """Carrega a detecção de hardware salva; retorna {} se ausente ou inválida."""
+    try:
+        data = json_loads(HW_CACHE_FILE.read_bytes())
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if data.get("kernel") != os.uname().release or data.get("version") != APP_VERSION:
+        return {}
+    if time.time() - float(data.get("ts", 0)) > HW_CACHE_TTL_S:
+        return {}
+    return data
+
+def save_hw_cache(data: Dict) -> None:
+    """Salva a detecção de hardware (best-effort)."""
+    try:
+        ensure_cache_dir()
+        payload = dict(data, kernel=os.uname().release, version=APP_VERSION, ts=time.time())
+        write_atomic(HW_CACHE_FILE, json_dumps(payload))
+    except Exception:
+        LOG.debug("Falha ao salvar cache de hardware", exc_info=True)
+
+@lru_cache(maxsize=1)
+def detect_hardware() -> Dict:
+    """Retorna {'cpu', 'gpus', 'distro'} do cache em disco ou detectando (uma vez por processo)."""
+    cached = load_hw_cache()
+    if cached:
+        try:
+            return {"cpu": str(cached["cpu"]), "gpus": list(cached["gpus"]),
+                    "distro": tuple(cached["distro"])}
+        except Exception:
+            pass
+    # Três sondagens independentes (arquivos/subprocessos): em paralelo
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        cpu_f, gpu_f, distro_f = ex.submit(detect_cpu_vendor), ex.submit(detect_gpu_vendors), ex.submit(detect_distro)
+        hw = {"cpu": cpu_f.result(), "gpus": gpu_f.result(), "distro": distro_f.result()}
+    save_hw_cache({"cpu": hw["cpu"], "gpus": hw["gpus"], "distro": list(hw["distro"])})
+    return hw
+
+
+def _detect_hw_async(on_done: Callable[[Dict], bool], warmers: Sequence[Callable[[], object]] = ()) -> None:
+    """Roda detect_hardware() em thread e entrega o resultado ao GTK via GLib.idle_add.
+
+    `warmers` aquecem outros caches (repos, PATH, pacotes) em paralelo, fora do loop GTK.
+    """
+    def warm(fn: Callable[[], object]) -> None:
+        try:
+            fn()
+        except Exception:
+            LOG.debug("Falha ao pré-carregar %r", fn, exc_info=True)
+
+    def work() -> None:
+        with ThreadPoolExecutor(max_workers=1 + len(warmers)) as ex:
+            for fn in warmers:
+                ex.submit(warm, fn)
+            try:
+                hw = ex.submit(detect_hardware).result()
+            except Exception:
+                LOG.warning("Falha na detecção de hardware", exc_info=True)
+                hw = {"cpu": "", "gpus": [], "distro": ("unknown", "Linux")}
+            GLib.idle_add(on_done, hw)
+    threading.Thread(target=work, daemon=True).start()
+
 
 # =============================================================================
 # UI helpers
 # =============================================================================
 
+_MONITOR_CACHE: Optional[Tuple[int, int, int, int, int]] = None
+_MONITOR_SIGNALS_READY = False
+
+def _invalidate_monitor_cache() -> None:
+    """Descarta as métricas memorizadas (monitores/tela mudaram)."""
+    global _MONITOR_CACHE
+    _MONITOR_CACHE = None
+
+_MONITOR_REFRESH_PENDING = False
+
+def _refresh_monitor_cache() -> bool:
+    """Recalcula as métricas quando o loop está ocioso (callback do idle_add)."""
+    global _MONITOR_CACHE, _MONITOR_REFRESH_PENDING
+    _MONITOR_REFRESH_PENDING = False
+    _MONITOR_CACHE = _query_monitor_metrics()
+    return False
+
+def _schedule_monitor_refresh(*_args: object) -> bool:
+    """Handler dos sinais da tela: invalida e agenda um único recálculo em prioridade baixa."""
+    global _MONITOR_REFRESH_PENDING
+    _invalidate_monitor_cache()
+    if not _MONITOR_REFRESH_PENDING:
+        _MONITOR_REFRESH_PENDING = True
+        GLib.idle_add(_refresh_monitor_cache, priority=GLib.PRIORITY_LOW)
+    return False
+
+def _watch_monitor_changes() -> None:
+    """Conecta (uma vez) os sinais da tela que invalidam o cache de métricas."""
+    global _MONITOR_SIGNALS_READY
+    if _MONITOR_SIGNALS_READY:
+        return
+    try:
+        scr = Gdk.Screen.get_default()
+        if scr:
+            scr.connect("monitors-changed", _schedule_monitor_refresh)
+            scr.connect("size-changed", _schedule_monitor_refresh)
+            _MONITOR_SIGNALS_READY = True
+    except Exception:
+        pass
+
 def _primary_monitor_metrics() -> Tuple[int, int, int, int, int]:
-    """Retorna (screen_w, screen_h, work_w, work_h, scale_factor)."""
-    screen_w = screen_h = work_w = work_h = 0
-    scale = 1
+    """Retorna (screen_w, screen_h, work_w, work_h, scale_factor), memorizado até mudar o monitor."""
+    global _MONITOR_CACHE
+    if _MONITOR_CACHE is None:
+        _watch_monitor_changes()
+        _MONITOR_CACHE = _query_monitor_metrics()
+    return _MONITOR_CACHE
+
+def _prefetch_monitor_metrics() -> None:
+    """Aquece o cache de métricas antes de montar a janela (se já houver display)."""
     try:
-        disp = Gdk.Display.get_default()
-        if disp:
-            mon = None
-            try:
-                mon = disp.get_primary_monitor()
-            except Exception:
-                pass
-            if mon is None:
-                try:
-                    mon = disp.get_monitor(0)
-                except Exception:
-                    mon = None
-            if mon:
-                geo = mon.get_geometry()
-                screen_w, screen_h = int(geo.width), int(geo.height)
-                try:
-                    wa = mon.get_workarea()
-                    work_w, work_h = int(wa.width), int(wa.height)
-                except Exception:
-                    work_w, work_h = screen_w, screen_h
-                try:
-                    scale = int(mon.get_scale_factor())
-                except Exception:
-                    scale = 1
+        if Gdk.Display.get_default() is not None:
+            _primary_monitor_metrics()
     except Exception:
         pass
 
+def _monitor_metrics_fallback() -> Tuple[int, int, int, int, int]:
+    """Sem monitor GDK: usa o tamanho da Gdk.Screen (ou 1024x768)."""
+    screen_w = screen_h = 0
+    try:
+        scr = Gdk.Screen.get_default()
+        if scr:
+            screen_w, screen_h = scr.get_width(), scr.get_height()
+    except Exception:
+        pass
+    return screen_w, screen_h, (screen_w or 1024), (screen_h or 768), 1
+
+def _gdk_monitor_metrics() -> Tuple[int, int, int, int, int]:
+    """Caminho direto pelo Gdk.Monitor primário (ou o primeiro), sem try aninhado."""
+    disp = Gdk.Display.get_default()
+    if disp is None:
+        return _monitor_metrics_fallback()
+    mon = disp.get_primary_monitor() or disp.get_monitor(0)
+    if mon is None:
+        return _monitor_metrics_fallback()
+    geo = mon.get_geometry()
+    wa = mon.get_workarea()
+    screen_w, screen_h = int(geo.width), int(geo.height)
     if not screen_w or not screen_h:
-        try:
-            scr = Gdk.Screen.get_default()
-            if scr:
-                screen_w, screen_h = scr.get_width(), scr.get_height()
-                work_w, work_h = screen_w, screen_h
-        except Exception:
-            pass
+        return _monitor_metrics_fallback()
+    return screen_w, screen_h, (int(wa.width) or screen_w), (int(wa.height) or screen_h), (int(mon.get_scale_factor()) or 1)
+
+def _query_monitor_metrics() -> Tuple[int, int, int, int, int]:
+    """Consulta o GDK: (screen_w, screen_h, work_w, work_h, scale_factor)."""
+    try:
+        return _gdk_monitor_metrics()
+    except Exception:
+        return _monitor_metrics_fallback()
 
-    if not work_w or not work_h:
-        work_w, work_h = (screen_w or 1024), (screen_h or 768)
-    return screen_w, screen_h, work_w, work_h, (scale or 1)
+# Fração máxima da workarea ocupada pela janela, em milésimos (lida uma vez)
+_WIN_FRAC_MILLI = int(float(os.environ.get("GNUSK_WIN_FRACTION", "0.92")) * 1000)
+_WIN_MIN_SCALE_MILLI = 650
+
+@lru_cache(maxsize=8)
+def _fit_window(base_w: int, base_h: int, work_w: int, work_h: int) -> Tuple[int, int]:
+    """Escala (base_w, base_h) para caber na workarea, só com aritmética inteira."""
+    max_w = work_w * _WIN_FRAC_MILLI // 1000
+    max_h = work_h * _WIN_FRAC_MILLI // 1000
+    s = min(max_w * 1000 // base_w, max_h * 1000 // base_h, 1000)
+    s = max(s, _WIN_MIN_SCALE_MILLI)
+    return min(base_w * s // 1000, max_w), min(base_h * s // 1000, max_h)
 
 def _suggested_window_size(base_w: int = 980, base_h: int = 640) -> Tuple[int, int, int]:
     """Calcula tamanho proporcional que caiba na workarea."""
     _, _, work_w, work_h, _ = _primary_monitor_metrics()
-    frac = float(os.environ.get("GNUSK_WIN_FRACTION", "0.92"))
-    max_w = int(work_w * frac)
-    max_h = int(work_h * frac)
-
-    s = min(max_w / float(base_w), max_h / float(base_h), 1.0)
-    s = max(s, 0.65)
-    win_w = min(int(base_w * s), max_w)
-    win_h = min(int(base_h * s), max_h)
+    win_w, win_h = _fit_window(base_w, base_h, work_w, work_h)
     return win_w, win_h, work_h
 
+# Faixas de altura da workarea → (largura, altura) mínimas dos cards
+_CARD_SIZE_BREAKS: Tuple[int, ...] = (720, 900)
+_CARD_SIZES: Tuple[Tuple[int, int], ...] = ((360, 80), (420, 86), (440, 88))
+
 def adjust_card_sizes_for_screen(screen_height: Optional[int] = None) -> None:
     """Ajusta mínimos dos cards usando a altura real (workarea)."""
     global CARD_MIN_WIDTH, CARD_MIN_HEIGHT
     try:
-        h = int(screen_height) if screen_height else Gdk.Screen.get_default().get_height()  # type: ignore[union-attr]
+        h = int(screen_height) if screen_height else _primary_monitor_metrics()[3]
     except Exception:
         h = 900
+    CARD_MIN_WIDTH, CARD_MIN_HEIGHT = _CARD_SIZES[bisect.bisect_right(_CARD_SIZE_BREAKS, h)]
 
-    if h < 720:
-        CARD_MIN_WIDTH = 360; CARD_MIN_HEIGHT = 80
-    elif h < 900:
-        CARD_MIN_WIDTH = 420; CARD_MIN_HEIGHT = 86
-    else:
-        CARD_MIN_WIDTH = 440; CARD_MIN_HEIGHT = 88
-
-def make_card_button(child_builder: Callable[[], Gtk.Widget], tooltip: Optional[str] = None) -> Gtk.Button:
-    """Cria um botão “card” com estilo padrão."""
+def make_card_button(child: Gtk.Widget, tooltip: Optional[str] = None) -> Gtk.Button:
+    """Cria um botão “card” com estilo padrão envolvendo o widget já montado."""
     btn = Gtk.Button()
-    btn.get_style_context().add_class("card-btn")
+    _add_class(btn, CLS_CARD_BTN)
     btn.set_halign(Gtk.Align.FILL); btn.set_valign(Gtk.Align.CENTER)
     btn.set_size_request(CARD_MIN_WIDTH, CARD_MIN_HEIGHT)
     if tooltip: btn.set_tooltip_text(tooltip)
-    btn.add(child_builder()); return btn
+    btn.add(child); return btn
+
+def _build_card_row(label: str, icon: str) -> Gtk.Widget:
+    """Linha interna do card: ícone + rótulo centralizado."""
+    row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+    _add_class(row, CLS_ROW)
+    row.pack_start(card_icon(icon), False, False, 0)
+    lbl = Gtk.Label(label=label, xalign=0.5, yalign=0.5, hexpand=True)
+    _add_class(lbl, CLS_BTN_LABEL)
+    row.pack_start(lbl, True, True, 0); return row
 
 def action_card(label: str, icon: str, on_click: Callable, tooltip: Optional[str] = None) -> Gtk.Button:
     """Card com ícone + rótulo centralizado."""
-    def build() -> Gtk.Widget:
-        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-        row.get_style_context().add_class("row")
-        row.pack_start(card_icon(icon), False, False, 0)
-        lbl = Gtk.Label(label=label); lbl.set_xalign(0.5); lbl.set_yalign(0.5); lbl.set_hexpand(True)
-        lbl.get_style_context().add_class("btn-label")
-        row.pack_start(lbl, True, True, 0); return row
-    btn = make_card_button(build, tooltip); btn.connect("clicked", on_click); return btn
+    btn = make_card_button(_build_card_row(label, icon), tooltip)
+    btn.connect("clicked", on_click); return btn
 
 def attach_in_two_columns(grid: Gtk.Grid, widgets: Sequence[Gtk.Widget]) -> None:
-    """Anexa cards em grid 2 colunas com SizeGroup para alinhamento."""
-    sg_w = Gtk.SizeGroup(mode=Gtk.SizeGroupMode.HORIZONTAL)
-    sg_h = Gtk.SizeGroup(mode=Gtk.SizeGroupMode.VERTICAL)
+    """Anexa cards em grid 2 colunas (alinhamento via grid homogêneo + size_request dos cards)."""
     cols = 2; r = c = 0
     for w in widgets:
-        sg_w.add_widget(w); sg_h.add_widget(w)
         grid.attach(w, c, r, 1, 1); c += 1
         if c >= cols: c = 0; r += 1
 
-def _clear_container(box: Gtk.Container) -> None:
-    """Remove todos os filhos de um container GTK."""
-    for ch in list(box.get_children()):
-        box.remove(ch)
+def _iter_children(box: Gtk.Container) -> List[Gtk.Widget]:
+    """Filhos diretos do container, coletados numa passada do foreach (sem GList intermediária)."""
+    buf: List[Gtk.Widget] = []
+    box.foreach(buf.append)
+    return buf
+
+def _center_message_labels(dlg: Gtk.MessageDialog) -> None:
+    """Centraliza os rótulos da área de mensagem de um MessageDialog."""
+    for ch in _iter_children(dlg.get_message_area()):
+        if isinstance(ch, Gtk.Label):
+            ch.set_xalign(0.5); ch.set_justify(Gtk.Justification.CENTER)
 
 def new_cards_grid() -> Gtk.Grid:
     """Grid padronizado (mesmo spacing V/H)."""
     g = Gtk.Grid()
     g.set_row_spacing(GRID_SP)
     g.set_column_spacing(GRID_SP)
+    g.set_row_homogeneous(True)
+    g.set_column_homogeneous(True)
     g.set_halign(Gtk.Align.CENTER)
     g.set_valign(Gtk.Align.CENTER)
     return g
@@ -834,41 +1371,46 @@ class Submenu(Gtk.Box):
         desc: str = ""
     ):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        self.freeze_child_notify()  # agrupa as notificações de filhos até o fim da montagem
         self.section_key = section_key; self.on_back = on_back; self.app_window = app_window
+        self.section_title = title
         self.set_border_width(10)
 
         if hasattr(self.app_window, "set_sub_header"):
             self.app_window.set_sub_header(title, self._back_clicked)
 
         header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-        header.get_style_context().add_class("header")
+        _add_class(header, CLS_HEADER)
         header.pack_start(build_icon(menu_icon, HEADER_ICON_PX), False, False, 0)
 
         v = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-        t = Gtk.Label.new(title); t.set_xalign(0.0); t.get_style_context().add_class("header-title")
-        s = Gtk.Label.new(desc); s.set_xalign(0.0); s.get_style_context().add_class("header-subtitle")
+        t = Gtk.Label.new(title); t.set_xalign(0.0); _add_class(t, CLS_HEADER_TITLE)
+        s = Gtk.Label.new(desc); s.set_xalign(0.0); _add_class(s, CLS_HEADER_SUBTITLE)
         v.pack_start(t, False, False, 0); v.pack_start(s, False, False, 0)
         header.pack_start(v, True, True, 0); self.pack_start(header, False, False, 0)
 
         sc = Gtk.ScrolledWindow(); sc.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC); sc.set_vexpand(True)
         self.pack_start(sc, True, True, 0)
 
-        grid_wrap = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
-        grid_wrap.set_halign(Gtk.Align.CENTER); grid_wrap.set_valign(Gtk.Align.CENTER); sc.add(grid_wrap)
-
-        grid = new_cards_grid()
-        grid_wrap.pack_start(grid, True, True, 0)
-
+        # Cards criados (com handlers) antes de tocar no grid; grid preenchido ainda sem pai,
+        # de modo que os attach não propagam queue_resize pela árvore a cada card.
         cards: List[Gtk.Button] = []
         for it in items:
             btn = action_card(
-                it["label"], it.get("icon","applications-system"),
-                on_click=lambda _w, _it=it: self.app_window.handle_action(self.section_key, _it),
+                it["label"], sys.intern(it.get("icon","applications-system")),
+                on_click=partial(self.app_window.handle_action, self.section_key, it),
                 tooltip=it.get("tooltip"),
             )
             cards.append(btn)
+        grid = new_cards_grid()
         attach_in_two_columns(grid, cards)
 
+        grid_wrap = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        grid_wrap.set_halign(Gtk.Align.CENTER); grid_wrap.set_valign(Gtk.Align.CENTER)
+        grid_wrap.pack_start(grid, True, True, 0)
+        sc.add(grid_wrap)
+        self.thaw_child_notify()
+
     def _back_clicked(self, *_args: object) -> None:
         """Callback do botão 'voltar' no HeaderBar."""
         if hasattr(self.app_window, "set_main_header"):
@@ -880,101 +1422,300 @@ class Submenu(Gtk.Box):
 # Ações / Terminais
 # =============================================================================
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TerminalSpec:
     name: str
-    args: List[str]
+    args: Tuple[str, ...]
     needs_string: bool
     wayland_pref: bool
+    available: bool = field(init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Uma busca no PATH por terminal, feita quando a tabela é montada
+        object.__setattr__(self, "available", _which(self.args[0]) is not None)
+
+@dataclass(frozen=True, slots=True)
+class Action:
+    """Item instalável: pacotes, binário para abrir, app Flatpak e pacotes alternativos."""
+    packages: Tuple[str, ...] = ()
+    exec: Optional[str] = None
+    flatpak: Optional[str] = None
+    alt_packages: Tuple[str, ...] = ()
+
+_NO_ACTION = Action()
+
+# ACTION_MAP / TERMINALS são montados sob demanda (primeiro uso), não no import.
+# Dentro do módulo use _build_action_map()/_build_terminals(); de fora, o __getattr__
+# do módulo (PEP 562) continua expondo os nomes ACTION_MAP e TERMINALS.
+
+@lru_cache(maxsize=1)
+def _build_action_map() -> Mapping[str, Action]:
+    """Mapa de itens (pacotes, exec, flatpak, alternativas)."""
+    return MappingProxyType({
+        "intel-mesa": Action(packages=("mesa", "vulkan-intel", "lib32-vulkan-intel", "vulkan-icd-loader", "lib32-vulkan-icd-loader")),
+        "amd-mesa":   Action(packages=("mesa", "vulkan-radeon", "lib32-vulkan-radeon", "vulkan-icd-loader", "lib32-vulkan-icd-loader")),
+        "gamemode":   Action(packages=("gamemode", "lib32-gamemode")),
+        "tuned-performance": Action(packages=("tuned",)),
+        "cpupower-performance": Action(packages=("cpupower",)),
+        "zram":       Action(packages=("zram-generator",)),
+        "preload":    Action(packages=("preload",)),
+
+        "steam":   Action(packages=("steam",), exec="steam", flatpak="com.valvesoftware.Steam"),
+        "lutris":  Action(packages=("lutris",), exec="lutris", flatpak="net.lutris.Lutris"),
+        "heroic":  Action(packages=("heroic-games-launcher",), exec="heroic", flatpak="com.heroicgameslauncher.hgl"),
+
+        "protonplus": Action(packages=("protonplus",), exec="protonplus", flatpak="com.vysp3r.ProtonPlus"),
+
+        # Wine completo + winecfg como exec para abrir caso tudo já esteja presente
+        "wine": Action(
+            packages=(
+                "wine","winetricks","dxvk-bin","vkd3d","vkd3d-proton",
+                "samba"
+            ),
+            exec="winecfg",
+        ),
+
+        "bottles": Action(packages=("bottles",), exec="bottles", flatpak="com.usebottles.bottles"),
+        "mangohud": Action(packages=("mangohud", "lib32-mangohud")),
+        "steam-acolyte": Action(packages=("steam-acolyte",), exec="steam-acolyte"),
+        "goverlay": Action(packages=("goverlay",), exec="goverlay"),
+        "python-steam": Action(packages=("python-steam",)),
+        "corectrl": Action(packages=("corectrl",), exec="corectrl"),
+        "gwe": Action(packages=("gwe", "greenwithenvy"), exec="gwe", flatpak="com.leinardi.gwe"),
+        "adwsteamgtk": Action(packages=("adwsteamgtk",), exec="adwsteamgtk", flatpak="io.github.Foldex.AdwSteamGtk"),
+    })
+
+# Nome virtual → provedores concretos, em ordem de preferência (o último é o fallback AUR)
+VIRTUAL_PROVIDERS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "vkd3d-proton": ("vkd3d-proton", "vkd3d-proton-bin"),
+})
 
-# Mapa de itens (pacotes, exec, flatpak, alternativas)
-ACTION_MAP: Dict[str, Dict[str, object]] = {
-    "intel-mesa": {"packages": ["mesa", "vulkan-intel", "lib32-vulkan-intel", "vulkan-icd-loader", "lib32-vulkan-icd-loader"]},
-    "amd-mesa":   {"packages": ["mesa", "vulkan-radeon", "lib32-vulkan-radeon", "vulkan-icd-loader", "lib32-vulkan-icd-loader"]},
-    "gamemode":   {"packages": ["gamemode", "lib32-gamemode"]},
-    "tuned-performance": {"packages": ["tuned"]},
-    "cpupower-performance": {"packages": ["cpupower"]},
-    "zram":       {"packages": ["zram-generator"]},
-    "preload":    {"packages": ["preload"]},
-
-    "steam":   {"packages": ["steam"], "exec": "steam", "flatpak": "com.valvesoftware.Steam"},
-    "lutris":  {"packages": ["lutris"], "exec": "lutris", "flatpak": "net.lutris.Lutris"},
-    "heroic":  {"packages": ["heroic-games-launcher"], "exec": "heroic", "flatpak": "com.heroicgameslauncher.hgl"},
-
-    "protonplus": {"packages": ["protonplus"], "exec": "protonplus", "flatpak": "com.vysp3r.ProtonPlus"},
-
-    # Wine completo + winecfg como exec para abrir caso tudo já esteja presente
-    "wine": {
-        "packages": [
-            "wine","winetricks","dxvk-bin","vkd3d","vkd3d-proton",
-            "samba"
-        ],
-        "exec": "winecfg"
-    },
-
-    "bottles": {"packages": ["bottles"], "exec": "bottles", "flatpak": "com.usebottles.bottles"},
-    "mangohud": {"packages": ["mangohud", "lib32-mangohud"]},
-    "steam-acolyte": {"packages": ["steam-acolyte"], "exec": "steam-acolyte"},
-    "goverlay": {"packages": ["goverlay"], "exec": "goverlay"},
-    "python-steam": {"packages": ["python-steam"]},
-    "corectrl": {"packages": ["corectrl"], "exec": "corectrl"},
-    "gwe": {"packages": ["gwe", "greenwithenvy"], "exec": "gwe", "flatpak": "com.leinardi.gwe"},
-    "adwsteamgtk": {"packages": ["adwsteamgtk"], "exec": "adwsteamgtk", "flatpak": "io.github.Foldex.AdwSteamGtk"},
-}
+# Cards de driver bloqueados quando o vendor de GPU não é detectado
+GPU_GATED_ITEMS = frozenset({"nvidia-driver", "intel-mesa", "amd-mesa"})
 
-# Pacotes opcionais de multimídia para Wine (pergunta no fim da instalação)
-GSTREAMER_WINE_PKGS: List[str] = [
+# Pacotes opcionais de multimídia para Wine (perguntados junto com a instalação)
+GSTREAMER_WINE_PKGS: Tuple[str, ...] = (
     "gst-plugins-base","gst-plugins-good","gst-plugins-bad",
     "lib32-gst-plugins-base","lib32-gst-plugins-good","lib32-gst-plugins-bad",
-]
-
-TERMINALS: List[TerminalSpec] = [
-    TerminalSpec("kgx", ["kgx","--","bash","-lc"], False, True),
-    TerminalSpec("ghostty", ["ghostty","--","bash","-lc"], False, True),
-    TerminalSpec("foot", ["foot","-e","bash","-lc"], False, True),
-    TerminalSpec("footclient", ["footclient","-e","bash","-lc"], False, True),
-    TerminalSpec("rio", ["rio","-e","bash","-lc"], False, True),
-    TerminalSpec("wezterm", ["wezterm","start","bash","-lc"], False, True),
-    TerminalSpec("gnome-terminal", ["gnome-terminal","--wait","--","bash","-lc"], False, False),
-    TerminalSpec("konsole", ["konsole","-e","bash","-lc"], False, False),
-    TerminalSpec("xterm", ["xterm","-e","bash","-lc"], False, False),
-    TerminalSpec("terminator", ["terminator","-x","bash","-lc"], False, False),
-    TerminalSpec("urxvt", ["urxvt","-e","bash","-lc"], False, False),
-    TerminalSpec("rxvt", ["rxvt","-e","bash","-lc"], False, False),
-    TerminalSpec("st", ["st","-e","bash","-lc"], False, False),
-    TerminalSpec("eterm", ["eterm","-e","bash","-lc"], False, False),
-    TerminalSpec("terminology", ["terminology","-e","bash","-lc"], False, False),
-    TerminalSpec("alacritty", ["alacritty","-e","bash","-lc"], False, False),
-    TerminalSpec("kitty", ["kitty","-e","bash","-lc"], False, False),
-    TerminalSpec("tilix", ["tilix","--","bash","-lc"], False, False),
-    TerminalSpec("xfce4-terminal", ["xfce4-terminal","--command"], True, False),
-    TerminalSpec("mate-terminal", ["mate-terminal","--","bash","-lc"], False, False),
-    TerminalSpec("qterminal", ["qterminal","-e","bash","-lc"], False, False),
-    TerminalSpec("lxterminal", ["lxterminal","-e","bash","-lc"], False, False),
-]
+)
+
+# Comandos fixos do Flathub (montados uma vez)
+FLATHUB_REPO_URL = "https://flathub.org/repo/flathub.flatpakrepo"
+FLATHUB_REMOTE_ADD_CMD = f"flatpak remote-add --if-not-exists flathub {FLATHUB_REPO_URL}"
+FLATHUB_REMOTE_ADD = f"set -euo pipefail; {FLATHUB_REMOTE_ADD_CMD}"
+
+@lru_cache(maxsize=1)
+def _build_terminals() -> Mapping[str, TerminalSpec]:
+    """Terminais por nome do binário; a ordem de inserção é a preferência de busca."""
+    return MappingProxyType({
+        "kgx": TerminalSpec("kgx", ("kgx","--","bash","-lc"), False, True),
+        "ghostty": TerminalSpec("ghostty", ("ghostty","--","bash","-lc"), False, True),
+        "foot": TerminalSpec("foot", ("foot","-e","bash","-lc"), False, True),
+        "footclient": TerminalSpec("footclient", ("footclient","-e","bash","-lc"), False, True),
+        "rio": TerminalSpec("rio", ("rio","-e","bash","-lc"), False, True),
+        "wezterm": TerminalSpec("wezterm", ("wezterm","start","bash","-lc"), False, True),
+        "gnome-terminal": TerminalSpec("gnome-terminal", ("gnome-terminal","--wait","--","bash","-lc"), False, False),
+        "konsole": TerminalSpec("konsole", ("konsole","-e","bash","-lc"), False, False),
+        "xterm": TerminalSpec("xterm", ("xterm","-e","bash","-lc"), False, False),
+        "terminator": TerminalSpec("terminator", ("terminator","-x","bash","-lc"), False, False),
+        "urxvt": TerminalSpec("urxvt", ("urxvt","-e","bash","-lc"), False, False),
+        "rxvt": TerminalSpec("rxvt", ("rxvt","-e","bash","-lc"), False, False),
+        "st": TerminalSpec("st", ("st","-e","bash","-lc"), False, False),
+        "eterm": TerminalSpec("eterm", ("eterm","-e","bash","-lc"), False, False),
+        "terminology": TerminalSpec("terminology", ("terminology","-e","bash","-lc"), False, False),
+        "alacritty": TerminalSpec("alacritty", ("alacritty","-e","bash","-lc"), False, False),
+        "kitty": TerminalSpec("kitty", ("kitty","-e","bash","-lc"), False, False),
+        "tilix": TerminalSpec("tilix", ("tilix","--","bash","-lc"), False, False),
+        "xfce4-terminal": TerminalSpec("xfce4-terminal", ("xfce4-terminal","--command"), True, False),
+        "mate-terminal": TerminalSpec("mate-terminal", ("mate-terminal","--","bash","-lc"), False, False),
+        "qterminal": TerminalSpec("qterminal", ("qterminal","-e","bash","-lc"), False, False),
+        "lxterminal": TerminalSpec("lxterminal", ("lxterminal","-e","bash","-lc"), False, False),
+    })
+
+# Tipo de sessão não muda durante a execução do app
+_IS_WAYLAND = os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
+
+@lru_cache(maxsize=2)
+def _terminal_order(wayland: bool) -> Tuple[str, ...]:
+    """Ordem de busca dos terminais; em Wayland, os 'wayland_pref' primeiro (sort estável)."""
+    terms = _build_terminals()
+    if not wayland:
+        return tuple(terms)
+    return tuple(sorted(terms, key=lambda n: not terms[n].wayland_pref))
+
+@lru_cache(maxsize=2)
+def _available_terminals(wayland: bool) -> Tuple[TerminalSpec, ...]:
+    """Terminais instalados, já na ordem de preferência da sessão."""
+    terms = _build_terminals()
+    return tuple(terms[n] for n in _terminal_order(wayland) if terms[n].available)
+
+@lru_cache(maxsize=1)
+def _preferred_terminal() -> Optional[TerminalSpec]:
+    """Terminal da sessão: $TERMINAL se conhecido e instalado, senão o primeiro disponível."""
+    t = _build_terminals().get(os.environ.get("TERMINAL", ""))
+    if t is not None and t.available:
+        return t
+    avail = _available_terminals(_IS_WAYLAND)
+    return avail[0] if avail else None
+
+def __getattr__(name: str) -> object:
+    """PEP 562: expõe ACTION_MAP/TERMINALS montando-os no primeiro acesso."""
+    if name == "ACTION_MAP":
+        return _build_action_map()
+    if name == "TERMINALS":
+        return _build_terminals()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================================================================
 # App
 # =============================================================================
 
+# Pacotes de kernel instalados (linux, linux-zen, linux-lts...) para deduzir os headers
+_KERNEL_PKG_RE = re.compile(r"^linux(?:[0-9]+)?(?:-[a-z0-9]+)*$")
+
+# Sufixo no 'uname -r' → pacote de headers da variante
+_KERNEL_FLAVOR_HEADERS: Tuple[Tuple[str, str], ...] = (
+    ("-zen", "linux-zen-headers"),
+    ("-lts", "linux-lts-headers"),
+    ("-hardened", "linux-hardened-headers"),
+    ("-cachyos", "linux-cachyos-headers"),
+)
+
+def _flavor_headers(kernel_release: str) -> Tuple[str, ...]:
+    """Pacotes de headers das variantes presentes na release do kernel."""
+    return tuple(hdr for tag, hdr in _KERNEL_FLAVOR_HEADERS if tag in kernel_release)
+
+PACMAN_SYNC_DIR = "/var/lib/pacman/sync"
+OFFICIAL_CACHE_FILE = CACHE_DIR / "official_repos.json"
+
+def _sync_db_mtime() -> int:
+    """Maior mtime (ns) dos .db de sync do pacman; muda a cada 'pacman -Sy'."""
+    try:
+        with os.scandir(PACMAN_SYNC_DIR) as it:
+            return max((e.stat().st_mtime_ns for e in it if e.name.endswith(".db")), default=0)
+    except Exception:
+        return 0
+
+def load_official_cache(sync_mtime: int) -> Optional[frozenset]:
+    """Lista de pacotes oficiais salva em disco, se ainda casar com o mtime dos .db."""
+    try:
+        data = json_loads(OFFICIAL_CACHE_FILE.read_bytes())
+        if isinstance(data, dict) and data.get("sync_mtime") == sync_mtime:
+            return frozenset(data["names"])
+    except Exception:
+        pass
+    return None
+
+def save_official_cache(sync_mtime: int, names: frozenset) -> None:
+    """Salva a lista de pacotes oficiais (best-effort)."""
+    try:
+        ensure_cache_dir()
+        write_atomic(OFFICIAL_CACHE_FILE, json_dumps({"sync_mtime": sync_mtime, "names": sorted(names)}))
+    except Exception:
+        LOG.debug("Falha ao salvar cache dos repositórios oficiais", exc_info=True)
+
+@lru_cache(maxsize=1)
+def _official_names_at(sync_mtime: int) -> frozenset:
+    """Todos os pacotes dos repositórios de sync ativos (disco ou um único 'pacman -Slq').
+
+    Falha do pacman (ex.: DB travado) propaga a exceção para não ser memoizada.
+    """
+    if sync_mtime:
+        cached = load_official_cache(sync_mtime)
+        if cached:
+            return cached
+    out = subprocess.check_output(["pacman", "-Slq"], text=True, stderr=subprocess.DEVNULL)
+    names = frozenset(out.split())
+    if sync_mtime and names:
+        save_official_cache(sync_mtime, names)
+    return names
+
+PACMAN_CONF = "/etc/pacman.conf"
+_MULTILIB_RE = re.compile(rb"^[ \t]*\[multilib\]", re.M)
+_MULTILIB_CACHE: Tuple[int, bool] = (-1, False)  # (mtime_ns do pacman.conf, resultado)
+
+def multilib_enabled() -> bool:
+    """Seção [multilib] não comentada no pacman.conf (relida só quando o arquivo muda)."""
+    global _MULTILIB_CACHE
+    try:
+        mtime = os.stat(PACMAN_CONF).st_mtime_ns
+        if mtime != _MULTILIB_CACHE[0]:
+            with open(PACMAN_CONF, "rb") as f:
+                _MULTILIB_CACHE = (mtime, _MULTILIB_RE.search(f.read()) is not None)
+        return _MULTILIB_CACHE[1]
+    except Exception:
+        pass
+    try:
+        return subprocess.run(["pacman", "-Sl", "multilib"], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, check=False).returncode == 0
+    except Exception:
+        return False
+
+# Apps que sempre precisam do [multilib], mesmo sem lib32-* explícito na lista
+MULTILIB_ITEMS = frozenset({"steam", "wine", "mangohud"})
+
+ENABLE_MULTILIB_SCRIPT = r"""
+run_root_sh <<'EOS'
+set -euo pipefail
+cp /etc/pacman.conf{,.bak.$(date +%F-%H%M%S)}
+sed -ri 's/^\s*#\s*\[multilib\]/[multilib]/' /etc/pacman.conf
+sed -ri '/^\s*\[multilib\]/,/\s*(\[|\Z)/ { s/^\s*#\s*(Include)/\1/ }' /etc/pacman.conf
+grep -q '^\[multilib\]' /etc/pacman.conf
+pacman -Syy
+EOS
+"""
+
+def _official_names(sync_mtime: Optional[int] = None) -> frozenset:
+    """Lista oficial para o estado dos .db de sync; vazia (sem memoizar) se o pacman falhar."""
+    try:
+        return _official_names_at(_sync_db_mtime() if sync_mtime is None else sync_mtime)
+    except Exception:
+        LOG.debug("Falha ao listar os repositórios oficiais", exc_info=True)
+        return frozenset()
+
 @lru_cache(maxsize=1024)
-def _pkg_in_official_repos_cached(pkg: str) -> bool:
-    """Cache de checagem 'pacman -Si' para um pacote no repo oficial."""
-    return subprocess.run(["bash","-lc",f"pacman -Si {shlex.quote(pkg)} >/dev/null 2>&1"]).returncode == 0
+def _pkg_si_probe(pkg: str, sync_mtime: int) -> bool:
+    """Fallback 'pacman -Si' por pacote, memoizado por (pacote, mtime dos .db)."""
+    return subprocess.run(["pacman", "-Si", pkg], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
 
 def _which_in_official_repos(pkgs: Iterable[str]) -> set:
     """Retorna subconjunto de pkgs que existem nos repositórios oficiais."""
-    plist = [shlex.quote(p) for p in pkgs if p]
-    if not plist:
-        return set()
-    cmd = "pacman -Si " + " ".join(plist) + " 2>/dev/null | awk -F': *' '/^Name/{print $2}'"
-    try:
-        out = subprocess.check_output(["bash","-lc",cmd], text=True)
-        names = {line.strip() for line in out.splitlines() if line.strip()}
-        return names
-    except Exception:
-        return {p for p in pkgs if _pkg_in_official_repos_cached(p)}
+    sync_mtime = _sync_db_mtime()
+    names = _official_names(sync_mtime)
+    if names:
+        return {p for p in pkgs if p in names}
+    return {p for p in pkgs if p and _pkg_si_probe(p, sync_mtime)}
+
+def _clear_pkg_caches() -> None:
+    """Esquece as consultas ao pacman/PATH (chamado ao fim de cada instalação)."""
+    _which.cache_clear()
+    detect_caps.cache_clear()
+    pick_pkg_manager.cache_clear()
+    _official_names_at.cache_clear()
+    _pkg_si_probe.cache_clear()
+
+def wait_for_file(path: str, timeout_s: float) -> bool:
+    """Bloqueia até o arquivo existir (inotify se disponível; senão checa a cada 1 s)."""
+    deadline = time.monotonic() + timeout_s
+    if INotify is not None:
+        try:
+            with INotify() as ino:
+                ino.add_watch(os.path.dirname(path) or ".", inotify_flags.CREATE | inotify_flags.MOVED_TO)
+                # Checa depois de armar o watch: não perde criação entre os dois passos
+                while not os.path.exists(path):
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        return False
+                    ino.read(timeout=int(left * 1000))
+                return True
+        except Exception:
+            LOG.debug("inotify indisponível; usando polling da sentinela", exc_info=True)
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(1.0)
+    return False
 
 class App(Gtk.Window):
     """Janela principal do GNU/Shark."""
@@ -1000,14 +1741,24 @@ class App(Gtk.Window):
                 pass
 
         clean_legacy_state()
-        self.distro_id, self.distro_pretty = detect_distro()
+        # Detecção de hardware/distro roda em thread; valores provisórios até _on_hw_detected
+        self.distro_id, self.distro_pretty = "unknown", "Linux"
         self.pkg_manager = pick_pkg_manager()
 
-        self.cpu_vendor = detect_cpu_vendor()
-        self.gpu_vendors = detect_gpu_vendors()
+        self.cpu_vendor = ""
+        self.gpu_vendors: List[str] = []
+        # União PCI/sysfs + módulos carregados usada por _block_incompatible; None = recalcular
+        self._vendors_cache: Optional[frozenset] = None
+        self.hw_ready = False
+        self.drivers_card: Optional[Gtk.Button] = None
 
         self._policy_lock = threading.Lock()
         self._policy_installing = False
+        # Snapshot de 'pacman -Qq' compartilhado pelas checagens; None = recarregar
+        self._installed_set: Optional[frozenset] = None
+        # Estado do flatpak (remotes / apps instalados); None = consultar de novo
+        self._flathub_remote: Optional[bool] = None
+        self._flatpak_apps: Optional[frozenset] = None
 
         add_css()
         init_icon_theme()
@@ -1030,27 +1781,27 @@ class App(Gtk.Window):
         self.root.pack_start(self.stack, True, True, 0)
 
         self.page_main = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-        self.page_sub  = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.stack.add_named(self.page_main, "main")
-        self.stack.add_named(self.page_sub,  "sub")
         self.stack.set_visible_child_name("main")
+        # Submenus montados uma vez e mantidos no Stack (chave = section_key)
+        self._submenus: Dict[str, Submenu] = {}
+        self._main_built = False
 
         self._build_main()
         self.show_all()
-        self._init_post_steps()
+        _detect_hw_async(self._on_hw_detected,
+                         warmers=(detect_caps, _preferred_terminal, _official_names, self._installed_pkgs))
 
     # ----- Header API -----
 
     def set_main_header(self) -> None:
         """Define o HeaderBar padrão (título + sem subtítulo)."""
-        for child in list(self.hb.get_children()):
-            self.hb.remove(child)
+        self.hb.foreach(self.hb.remove)
         self.hb.set_title(APP_TITLE); self.hb.set_subtitle(None)
 
     def set_sub_header(self, section_title: str, back_cb: Callable[..., None]) -> None:
         """Define HeaderBar para subpáginas com botão Voltar."""
-        for child in list(self.hb.get_children()):
-            self.hb.remove(child)
+        self.hb.foreach(self.hb.remove)
         self.hb.set_title(f"{APP_TITLE}: {section_title}")
         self.hb.set_subtitle(None)
         back_btn = Gtk.Button()
@@ -1062,35 +1813,41 @@ class App(Gtk.Window):
     # ----- Main UI -----
 
     def _build_main(self) -> None:
-        """Constroi a página principal com cards de seções."""
-        _clear_container(self.page_main)
+        """Constroi a página principal com cards de seções (uma vez; reentradas não fazem nada)."""
+        if self._main_built:
+            return
+        self._main_built = True
 
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
 
         header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-        header.get_style_context().add_class("header")
+        _add_class(header, CLS_HEADER)
         header.pack_start(build_icon(APP_ICON_NAME, MAIN_HEADER_ICON_PX), False, False, 0)  # ícone do app aqui
 
         v = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-        title = Gtk.Label.new(APP_TITLE); title.set_xalign(0.0); title.get_style_context().add_class("header-title")
-        subtitle = Gtk.Label.new(T(APP_SUBTITLE)); subtitle.set_xalign(0.0); subtitle.get_style_context().add_class("header-subtitle")
+        title = Gtk.Label.new(APP_TITLE); title.set_xalign(0.0); _add_class(title, CLS_HEADER_TITLE)
+        subtitle = Gtk.Label.new(L_APP_SUBTITLE); subtitle.set_xalign(0.0); _add_class(subtitle, CLS_HEADER_SUBTITLE)
         v.pack_start(title, False, False, 0); v.pack_start(subtitle, False, False, 0)
         header.pack_start(v, True, True, 0); main_box.pack_start(header, False, False, 0)
 
         grid = new_cards_grid()
         main_box.pack_start(grid, True, True, 0)
 
+        self.drivers_card = action_card(L_DRIVERS, "drivers", self.open_drivers, L_DRIVERS_DESC)
+        if not self.hw_ready:
+            self.drivers_card.set_sensitive(False)
+            self.drivers_card.set_tooltip_text(T("Detectando hardware…"))
         cards = [
-            action_card(T("Drivers"), "drivers", self.open_drivers, T("Drivers e runtimes necessários para sua GPU.")),
-            action_card(T("Otimizações"), "opt", self.open_opt, T("Ajustes de desempenho para jogos.")),
-            action_card(T("Ferramentas"), "tools", self.open_tools, T("Gerenciadores de jogos e utilitários.")),
-            action_card(T("Repositórios"), "repository", self.open_repos, T("Repositórios adicionais")),
-            action_card(T("Extras"), "applications-utilities", self.open_extras, T("Recursos adicionais e opcionais.")),
+            self.drivers_card,
+            action_card(L_OPT, "opt", self.open_opt, T("Ajustes de desempenho para jogos.")),
+            action_card(L_TOOLS, "tools", self.open_tools, T("Gerenciadores de jogos e utilitários.")),
+            action_card(L_REPOS, "repository", self.open_repos, L_REPOS_ADD),
+            action_card(L_EXTRAS, "applications-utilities", self.open_extras, T("Recursos adicionais e opcionais.")),
         ]
         attach_in_two_columns(grid, cards)
 
         footer = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=16)
-        footer.set_halign(Gtk.Align.CENTER); footer.get_style_context().add_class("footer")
+        footer.set_halign(Gtk.Align.CENTER); _add_class(footer, CLS_FOOTER)
         footer.pack_start(Gtk.LinkButton(uri="https://github.com/gabriel-ruas-santos/gnu-shark/wiki", label=T("Wiki")), False, False, 0)
         footer.pack_start(Gtk.LinkButton(uri="https://github.com/gabriel-ruas-santos/gnu-shark/issues", label=T("Reportar Bug")), False, False, 0)
         about_btn = Gtk.Button(label=T("Sobre")); about_btn.connect("clicked", self.on_about)
@@ -1101,13 +1858,36 @@ class App(Gtk.Window):
         self.stack.set_visible_child_name("main")
         self.set_main_header()
 
-    def _show_submenu(self, widget: Gtk.Widget) -> None:
-        """Mostra uma subpágina com animação."""
+    def _on_hw_detected(self, hw: Dict) -> bool:
+        """Aplica o resultado da detecção (chamado no loop GTK via GLib.idle_add)."""
+        self.distro_id, self.distro_pretty = hw.get("distro") or ("unknown", "Linux")
+        self.cpu_vendor = hw.get("cpu", "")
+        self.gpu_vendors = list(hw.get("gpus", []))
+        self._vendors_cache = None
+        self.hw_ready = True
+        LOG.info("Hardware: distro=%s cpu=%s gpus=%s", self.distro_id, self.cpu_vendor or "?", self.gpu_vendors)
+        if self.drivers_card is not None:
+            self.drivers_card.set_sensitive(True)
+            self.drivers_card.set_tooltip_text(L_DRIVERS_DESC)
+        return False
+
+    def _show_submenu(self, view: Submenu) -> None:
+        """Mostra uma subpágina com animação (e a guarda no Stack para as próximas visitas)."""
         self.stack.set_transition_type(Gtk.StackTransitionType.SLIDE_LEFT)
-        _clear_container(self.page_sub)
-        self.page_sub.pack_start(widget, True, True, 0)
-        self.page_sub.show_all()
-        self.stack.set_visible_child_name("sub")
+        if view.get_parent() is None:
+            self._submenus[view.section_key] = view
+            self.stack.add_named(view, f"sub-{view.section_key}")
+            view.show_all()
+        self.stack.set_visible_child(view)
+
+    def _reshow_submenu(self, section_key: str) -> bool:
+        """Volta a um submenu já montado; False se ainda não existe."""
+        view = self._submenus.get(section_key)
+        if view is None:
+            return False
+        self.set_sub_header(view.section_title, view._back_clicked)
+        self._show_submenu(view)
+        return True
 
     def back_to_main(self) -> None:
         """Volta para a página principal com animação."""
@@ -1118,6 +1898,8 @@ class App(Gtk.Window):
     # ----- Submenus -----
 
     def open_drivers(self, _btn: Gtk.Button) -> None:
+        if self._reshow_submenu("drivers"):
+            return
         items = [
             {"label": T("Intel Mesa"), "id": "intel-mesa", "icon": "intel",
              "tooltip": T("Drivers Intel (Mesa) + Vulkan (loader e ICD).")},
@@ -1126,11 +1908,13 @@ class App(Gtk.Window):
             {"label": T("AMD Mesa/RADV"), "id": "amd-mesa", "icon": "amd",
              "tooltip": T("Drivers AMD (Mesa/RADV) + Vulkan (loader e ICD).")},
         ]
-        view = Submenu(self, T("Drivers"), "drivers", items, "drivers", self.back_to_main,
-                       desc=T("Drivers e runtimes necessários para sua GPU."))
+        view = Submenu(self, L_DRIVERS, "drivers", items, "drivers", self.back_to_main,
+                       desc=L_DRIVERS_DESC)
         self._show_submenu(view)
 
     def open_opt(self, _btn: Gtk.Button) -> None:
+        if self._reshow_submenu("opt"):
+            return
         items = [
             {"label": T("GameMode"), "id": "gamemode", "icon": "gamemode",
              "tooltip": T("Ativa otimizações de performance enquanto joga")},
@@ -1143,11 +1927,13 @@ class App(Gtk.Window):
             {"label": T("Preload"), "id": "preload", "icon": "system-run",
              "tooltip": T("Daemon que pré-carrega apps para abrir mais rápido")},
         ]
-        view = Submenu(self, T("Otimizações"), "opt", items, "opt", self.back_to_main,
+        view = Submenu(self, L_OPT, "opt", items, "opt", self.back_to_main,
                        desc=T("Ajustes de desempenho para melhorar a experiência em jogos."))
         self._show_submenu(view)
 
     def open_tools(self, _btn: Gtk.Button) -> None:
+        if self._reshow_submenu("tools"):
+            return
         items = [
             {"label": T("Steam"), "id": "steam", "icon": "steam", "tooltip": T("Cliente oficial de jogos")},
             {"label": T("Lutris"), "id": "lutris", "icon": "lutris", "tooltip": T("Gerenciador de jogos para rodar títulos nativos, Wine e emuladores")},
@@ -1159,12 +1945,14 @@ class App(Gtk.Window):
             {"label": T("Steam Acolyte"), "id": "steam-acolyte", "icon": "applications-system",
              "tooltip": T("Ferramenta CLI para configurar multiplas contas Steam")},
         ]
-        view = Submenu(self, T("Ferramentas"), "tools", items, "tools", self.back_to_main,
+        view = Submenu(self, L_TOOLS, "tools", items, "tools", self.back_to_main,
                        desc=T("Gerenciadores de jogos e utilitários complementares."))
         self._show_submenu(view)
 
     def open_repos(self, _btn: Gtk.Button) -> None:
         """Submenu Repositórios (inclui card Flathub)."""
+        if self._reshow_submenu("repos"):
+            return
         items = [
             {
                 "label": T("Flathub"),
@@ -1175,7 +1963,7 @@ class App(Gtk.Window):
         ]
         view = Submenu(
             self,
-            T("Repositórios"),
+            L_REPOS,
             "repository",  # ícone personalizado
             items,
             "repos",
@@ -1185,6 +1973,8 @@ class App(Gtk.Window):
         self._show_submenu(view)
 
     def open_extras(self, _btn: Gtk.Button) -> None:
+        if self._reshow_submenu("extras"):
+            return
         items = [
             {"label": T("Goverlay"), "id": "goverlay", "icon": "goverlay",
              "tooltip": T("Interface gráfica para MangoHUD e afins")},
@@ -1197,7 +1987,7 @@ class App(Gtk.Window):
             {"label": T("AdwSteamGtk"), "id": "adwsteamgtk", "icon": "adwsteamgtk",
              "tooltip": T("Deixa o Steam no visual GNOME/libadwaita")},
         ]
-        view = Submenu(self, T("Extras"), "applications-utilities", items, "extras", self.back_to_main,
+        view = Submenu(self, L_EXTRAS, "applications-utilities", items, "extras", self.back_to_main,
                        desc=T("Recursos adicionais e opcionais para usuários avançados."))
         self._show_submenu(view)
 
@@ -1220,17 +2010,14 @@ class App(Gtk.Window):
 
     def _wait_sentinel_then_notify(self, sentinel_path: str, restore_window: bool) -> None:
         """Espera a criação do arquivo-sentinela e só então mostra o 'Processo finalizado'."""
-        deadline = time.monotonic() + 4 * 60 * 60  # 4h
         try:
-            while time.monotonic() < deadline:
-                if os.path.exists(sentinel_path):
-                    try:
-                        os.remove(sentinel_path)
-                    except Exception:
-                        pass
-                    break
-                time.sleep(1.0)
+            if wait_for_file(sentinel_path, 4 * 60 * 60):  # 4h
+                try:
+                    os.remove(sentinel_path)
+                except Exception:
+                    pass
         finally:
+            GLib.idle_add(self._invalidate_after_install)
             if restore_window:
                 try:
                     GLib.idle_add(self.deiconify)
@@ -1242,47 +2029,57 @@ class App(Gtk.Window):
     # ---------- Resolver provedores virtuais ----------
     def _resolve_virtual_pkgs(self, pkgs: Sequence[str]) -> List[str]:
         """Troca nomes virtuais por provedores concretos para evitar prompts."""
+        wanted = [c for p in pkgs for c in VIRTUAL_PROVIDERS.get(p, ())]
+        if not wanted:
+            return list(pkgs)
+        official = _which_in_official_repos(wanted)
         resolved: List[str] = []
         for p in pkgs:
-            if p == "vkd3d-proton":
-                if _pkg_in_official_repos_cached("vkd3d-proton"):
-                    resolved.append("vkd3d-proton")
-                elif _pkg_in_official_repos_cached("vkd3d-proton-bin"):
-                    resolved.append("vkd3d-proton-bin")
-                else:
-                    resolved.append("vkd3d-proton-bin")
+            provs = VIRTUAL_PROVIDERS.get(p)
+            if provs:
+                # Primeiro provedor oficial; senão o último (AUR)
+                resolved.append(next((c for c in provs if c in official), provs[-1]))
             else:
                 resolved.append(p)
         return resolved
 
+    def _invalidate_after_install(self) -> bool:
+        """Esquece snapshot de pacotes e probes de PATH (helpers/apps recém-instalados).
+
+        Roda só no loop GTK (agendado via GLib.idle_add pelas threads de espera).
+        """
+        self._installed_set = None
+        self._flathub_remote = None
+        self._flatpak_apps = None
+        _clear_pkg_caches()
+        _gpu_modules_present.cache_clear()  # driver recém-instalado pode ter sido carregado
+        self._vendors_cache = None
+        self.pkg_manager = pick_pkg_manager()
+        return False
+
     # ---------- Checagens ----------
+    def _installed_pkgs(self) -> frozenset:
+        """Pacotes instalados (um único 'pacman -Qq'); refeito após cada instalação."""
+        if self._installed_set is None:
+            try:
+                out = subprocess.check_output(["pacman", "-Qq"], text=True, stderr=subprocess.DEVNULL)
+            except Exception:
+                return frozenset()
+            self._installed_set = frozenset(out.split())
+        return self._installed_set
+
     def _missing_packages(self, pkgs: Sequence[str]) -> List[str]:
         """Retorna lista de pacotes ausentes (não instalados)."""
-        pkgs = [p for p in pkgs if p]
-        if not pkgs:
+        installed = self._installed_pkgs()
+        rest = [p for p in pkgs if p and p not in installed]
+        if not rest:
             return []
-        cmd = "pacman -T " + " ".join(shlex.quote(p) for p in pkgs)
+        # Fora do snapshot ainda pode haver 'provides'; um só 'pacman -T' resolve o resto
         try:
-            out = subprocess.check_output(["bash", "-lc", cmd], text=True, stderr=subprocess.DEVNULL)
-            return [ln.strip() for ln in out.splitlines() if ln.strip()]
-        except subprocess.CalledProcessError as e:
-            text = (e.output or "")
-            return [ln.strip() for ln in text.splitlines() if ln.strip()]
+            out = subprocess.run(["pacman", "-T", *rest], capture_output=True, text=True).stdout
         except Exception:
-            missing = []
-            for p in pkgs:
-                rc = subprocess.run(["bash","-lc",f"pacman -Q {shlex.quote(p)} >/dev/null 2>&1"]).returncode
-                if rc != 0:
-                    missing.append(p)
-            return missing
-
-    def _any_installed(self, pkgs: Sequence[str]) -> bool:
-        """Retorna True se qualquer pacote da lista já estiver instalado."""
-        pkgs = [p for p in pkgs if p]
-        if not pkgs:
-            return False
-        missing = set(self._missing_packages(pkgs))
-        return len(missing) < len(set(pkgs))
+            return rest
+        return [ln.strip() for ln in out.splitlines() if ln.strip()]
 
     def _split_official_aur(self, pkgs: Iterable[str]) -> Tuple[List[str], List[str]]:
         """Separa pacotes entre oficiais e AUR."""
@@ -1295,9 +2092,10 @@ class App(Gtk.Window):
 
     def _detect_initramfs_tool(self) -> Tuple[str, str]:
         """Detecta ferramenta de initramfs e comando para regenerar."""
-        if shutil.which("mkinitcpio"):
+        caps = detect_caps()
+        if caps.mkinitcpio:
             return "mkinitcpio", "mkinitcpio -P"
-        if shutil.which("dracut"):
+        if caps.dracut:
             return "dracut", "dracut -f --kver \"$(uname -r)\""
         return "mkinitcpio", "mkinitcpio -P"
 
@@ -1351,17 +2149,10 @@ EOS
         with self._policy_lock:
             self._policy_installing = True
             try:
-                check_cmd = f"""
-[ -f {shlex.quote(RUNROOT_POLICY_PATH)} ] && [ -x {shlex.quote(RUNROOT_WRAPPER_PATH)} ] && \
-cmp -s {shlex.quote(RUNROOT_WRAPPER_PATH)} <(cat <<'EOF'
-{wrapper_content}
-EOF
-) && cmp -s {shlex.quote(RUNROOT_POLICY_PATH)} <(cat <<'EOF'
-{policy_content}
-EOF
-)
-"""
-                if subprocess.run(["bash","-lc",check_cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+                # O heredoc do script grava o conteúdo + '\n' final
+                if (os.access(RUNROOT_WRAPPER_PATH, os.X_OK)
+                        and file_has_content(RUNROOT_WRAPPER_PATH, wrapper_content + "\n")
+                        and file_has_content(RUNROOT_POLICY_PATH, policy_content + "\n")):
                     return
                 self._open_terminal_and_run_pipeline(script, need_root=True, ensure_policy=False)
             finally:
@@ -1380,78 +2171,29 @@ EOF
         if need_root:
             if os.geteuid() == 0:
                 run_mode = "root-euid0"
-            elif shutil.which("pkexec"):
+            elif detect_caps().pkexec:
                 run_mode = "root-pkexec"
             else:
                 run_mode = "root-sudo"
 
-        # Helpers run_root
-        if need_root and os.geteuid() == 0:
-            run_root_def = r"""
-run_root() { env PATH="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin" bash -lc "$1"; }
-run_root_sh() { env PATH="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin" bash -lc "$(cat)"; }
-export -f run_root run_root_sh
-""".strip()
-        elif need_root and shutil.which("pkexec"):
+        if run_mode == "root-pkexec":
             if ensure_policy and not getattr(self, "_policy_installing", False):
                 self._ensure_polkit_policy()
-            run_root_def = fr"""
-run_root() {{ printf '%s\n' "$1" | pkexec {RUNROOT_WRAPPER_PATH}; }}
-run_root_sh() {{ pkexec {RUNROOT_WRAPPER_PATH}; }}
-export -f run_root run_root_sh
-""".strip()
-        elif need_root:
-            # Suporte a askpass gráfico quando SUDO_ASKPASS estiver definido
-            askpass = os.environ.get("SUDO_ASKPASS", "")
-            sudo_flags = "-A -k" if askpass else "-k"
-            if not shutil.which("pkexec") and not askpass:
-                LOG.info("SUDO_ASKPASS não definido; será usado sudo no terminal interativo.")
-            run_root_def = f"""
-run_root() {{ sudo {sudo_flags} bash -lc "$1"; }}
-run_root_sh() {{ sudo {sudo_flags} bash -lc "$(cat)"; }}
-export -f run_root run_root_sh
-""".strip()
-        else:
-            run_root_def = r"""
-run_root() { bash -lc "$1"; }
-run_root_sh() { bash -lc "$(cat)"; }
-export -f run_root run_root_sh
-""".strip()
+        elif run_mode == "root-sudo" and not SUDO_ASKPASS:
+            LOG.info("SUDO_ASKPASS não definido; será usado sudo no terminal interativo.")
 
         # Script completo + sentinela final
         sentinel_path = f"/tmp/gnusk_done_{os.getpid()}_{int(time.time()*1000)}"
-        prefix = ["set -e", EXPECT_FUNC, run_root_def]
         full_script = (
-            " ; ".join(prefix)
-            + " ; set -o pipefail ; "
+            _script_prefix(run_mode)
             + bash_script
             + f" ; printf DONE > {shlex.quote(sentinel_path)} ; sync ; true"
         )
 
-        def _terminal_cmd_for(name: str) -> Optional[Tuple[List[str], bool]]:
-            """Retorna comando base do terminal pré-configurado pelo nome."""
-            for t in TERMINALS:
-                if t.name == name and shutil.which(t.name):  # FIX: usar t.name aqui
-                    return (list(t.args), bool(t.needs_string))
-            return None
-
         argv: Optional[List[str]] = None
-        term_env = os.environ.get("TERMINAL")
-
-        if term_env:
-            found = _terminal_cmd_for(term_env)
-            if found:
-                base, needs_string = found
-                argv = base + ([f"bash -lc {shlex.quote(full_script)}"] if needs_string else [full_script])
-
-        if argv is None:
-            wayland = os.environ.get("XDG_SESSION_TYPE","").lower() == "wayland"
-            terms = sorted(TERMINALS, key=lambda t: not t.wayland_pref) if wayland else TERMINALS
-            for t in terms:
-                if shutil.which(t.name):
-                    base = list(t.args)
-                    argv = base + ([f"bash -lc {shlex.quote(full_script)}"] if t.needs_string else [full_script])
-                    break
+        term = _preferred_terminal()
+        if term is not None:
+            argv = list(term.args) + ([f"bash -lc {shlex.quote(full_script)}"] if term.needs_string else [full_script])
 
         # Sem terminal → modo headless com log
         if argv is None:
@@ -1460,8 +2202,9 @@ export -f run_root run_root_sh
                                                  delete=False, mode="w", encoding="utf-8") as logf:
                     log_path = Path(logf.name)
                     try:
-                        proc = subprocess.Popen(["bash","-lc",full_script], stdout=logf, stderr=subprocess.STDOUT)
+                        proc = spawn(["bash","-lc",full_script], stdout=logf, stderr=subprocess.STDOUT)
                         proc.wait()
+                        GLib.idle_add(self._invalidate_after_install)
                         def done_msg() -> None:
                             dlg = Gtk.MessageDialog(transient_for=self, modal=True,
                                                     message_type=Gtk.MessageType.INFO,
@@ -1488,7 +2231,7 @@ export -f run_root run_root_sh
 
         def worker() -> None:
             try:
-                subprocess.Popen(argv)
+                spawn(argv)
                 # Espera a sentinela em outra thread (não bloqueia aqui)
                 threading.Thread(
                     target=self._wait_sentinel_then_notify,
@@ -1508,6 +2251,16 @@ export -f run_root run_root_sh
         if not mgr:
             return None
         lines = ["set -euo pipefail"]
+        helper = (mgr if mgr in ("paru","yay") else detect_caps().aur_helper) if aur else None
+        if helper:
+            # Uma transação só: o helper resolve oficiais + AUR juntos (uma autenticação)
+            pkgs = " ".join(shlex.quote(p) for p in (*official, *aur))
+            if helper == "paru":
+                # sem review/edição e sem prompts extras
+                lines.append(f"{helper} -S --needed --skipreview --noconfirm {pkgs}")
+            else:  # yay
+                lines.append(f"{helper} -S --needed --noconfirm --answerdiff None --answeredit None {pkgs}")
+            return " ; ".join(lines)
         if official:
             pkgs = " ".join(shlex.quote(p) for p in official)
             if mgr == "pamac":
@@ -1515,51 +2268,24 @@ export -f run_root run_root_sh
             else:
                 lines.append(f"expect_yes_pac \"run_root \\\"pacman -S --needed {pkgs}\\\"\"")
         if aur:
-            aur_pkgs = " ".join(shlex.quote(p) for p in aur)
-            helper = mgr if mgr in ("paru","yay") else ("paru" if shutil.which("paru") else "yay" if shutil.which("yay") else None)
-            if helper:
-                if helper == "paru":
-                    # sem review/edição e sem prompts extras
-                    lines.append(f"{helper} -S --needed --skipreview --noconfirm {aur_pkgs}")
-                else:  # yay
-                    lines.append(f"{helper} -S --needed --noconfirm --answerdiff None --answeredit None {aur_pkgs}")
-            elif mgr == "pamac":
-                lines.append(f"expect_yes_pac \"pamac build --no-confirm {aur_pkgs}\"")
-            else:
+            if mgr != "pamac":
                 return None
+            aur_pkgs = " ".join(shlex.quote(p) for p in aur)
+            lines.append(f"expect_yes_pac \"pamac build --no-confirm {aur_pkgs}\"")
         return " ; ".join(lines)
 
     def _kernel_variant(self) -> str:
         """Retorna a variante do kernel (uname -r) em minúsculas."""
-        try:
-            return subprocess.check_output(["uname","-r"], text=True).strip().lower()
-        except Exception:
-            return ""
+        return kernel_variant()
 
     def _header_pkg_candidates(self) -> List[str]:
         """Retorna candidatos plausíveis de headers para o kernel atual."""
-        ver = self._kernel_variant(); cands: List[str] = []
-        if "-zen" in ver: cands.append("linux-zen-headers")
-        if "-lts" in ver: cands.append("linux-lts-headers")
-        if "-hardened" in ver: cands.append("linux-hardened-headers")
-        if "-cachyos" in ver: cands.append("linux-cachyos-headers")
-        try:
-            out = subprocess.check_output(
-                ["bash","-lc","pacman -Qq | grep -E '^(linux([0-9]+)?(-[a-z0-9]+)*)$' | grep -v -- '-headers$' || true"], text=True)
-            for line in out.splitlines():
-                base = line.strip()
-                if base and base.startswith("linux"):
-                    cands.append(f"{base}-headers")
-        except Exception:
-            pass
+        cands: List[str] = list(_flavor_headers(self._kernel_variant()))
+        installed = sorted(self._installed_pkgs())  # mesma ordem do 'pacman -Qq'
+        cands.extend(f"{p}-headers" for p in installed
+                     if _KERNEL_PKG_RE.match(p) and not p.endswith("-headers"))
         cands.append("linux-headers")
-        try:
-            out = subprocess.check_output(["bash","-lc","pacman -Qq | grep -E '^linux.*-headers$' || true"], text=True)
-            for line in out.splitlines():
-                pkg = line.strip()
-                if pkg: cands.append(pkg)
-        except Exception:
-            pass
+        cands.extend(p for p in installed if p.startswith("linux") and p.endswith("-headers"))
         seen: set = set(); ordered: List[str] = []
         for p in cands:
             if p not in seen:
@@ -1568,47 +2294,61 @@ export -f run_root run_root_sh
 
     def _matching_header_pkg(self) -> Optional[str]:
         """Tenta casar headers com a variante do kernel atual; fallback para existentes no repo."""
-        ver = self._kernel_variant()
+        flavors = _flavor_headers(self._kernel_variant())
         cands = self._header_pkg_candidates()
         for p in cands:
-            if "-zen" in ver and p.startswith("linux-zen-headers"): return p
-            if "-lts" in ver and p.startswith("linux-lts-headers"): return p
-            if "-hardened" in ver and p.startswith("linux-hardened-headers"): return p
-            if "-cachyos" in ver and p.startswith("linux-cachyos-headers"): return p
-        for p in cands:
-            if subprocess.run(["bash","-lc",f"pacman -Si {shlex.quote(p)} >/dev/null 2>&1"]).returncode == 0:
-                return p
-        return None
+            if p.startswith(flavors): return p
+        official = _which_in_official_repos(cands)
+        return next((p for p in cands if p in official), None)
 
     def _headers_installed(self) -> bool:
         """True se algum pacote de headers compatível já estiver instalado."""
-        exact = self._matching_header_pkg()
-        if exact:
-            if subprocess.run(["bash","-lc",f"pacman -Q {shlex_quote(exact)} >/dev/null 2>&1"]).returncode == 0:
-                return True
-        return any(subprocess.run(["bash","-lc",f"pacman -Q {shlex_quote(p)} >/dev/null 2>&1"]).returncode == 0
-                   for p in self._header_pkg_candidates())
+        # _matching_header_pkg só escolhe entre estes candidatos: basta a interseção
+        return not self._installed_pkgs().isdisjoint(self._header_pkg_candidates())
 
     def _multilib_enabled(self) -> bool:
         """True se o repo multilib estiver ativo."""
-        try:
-            rc = subprocess.run(["bash", "-lc", "pacman -Sl multilib >/dev/null 2>&1"],
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False).returncode
-            return rc == 0
-        except Exception:
+        return multilib_enabled()
+
+    def _ensure_multilib(self) -> bool:
+        """Oferece ativar o [multilib]; False se o usuário recusar."""
+        if self._multilib_enabled():
+            return True
+        if not self._confirm(T("Multilib"),
+                             T("Alguns pacotes 32-bit requerem o repositório [multilib].\n\nAtivar automaticamente e atualizar bancos de dados agora?")):
+            self._info(T("Multilib"), T("Ative manualmente em /etc/pacman.conf e rode: sudo pacman -Syy"))
             return False
+        self._open_terminal_and_run_pipeline(ENABLE_MULTILIB_SCRIPT, need_root=True)
+        return True
 
     # ------------------- Pós-instalação -----------------------
-    def _post_gamemode(self) -> None:
-        cmd = "set -euo pipefail ; systemctl --user enable --now gamemoded || true ; gamemoded -t || true"
+    def _run_async(self, fn: Callable[..., object], *args: object,
+                   on_done: Optional[Callable[[object], object]] = None) -> None:
+        """Roda fn(*args) numa thread; on_done(resultado) volta ao loop GTK via GLib.idle_add."""
         def worker() -> None:
             try:
-                out = subprocess.check_output(["bash","-lc",cmd], text=True, stderr=subprocess.STDOUT)
-            except subprocess.CalledProcessError as e:
-                out = e.output or str(e)
-            GLib.idle_add(self._info, T("GameMode"), T("Serviço ativado.\n\nResultado do teste:\n{out}", out=out.strip()))
+                result = fn(*args)
+            except Exception as e:
+                LOG.warning("Falha em tarefa de fundo", exc_info=True)
+                result = e
+            if on_done is not None:
+                GLib.idle_add(on_done, result)
         threading.Thread(target=worker, daemon=True).start()
 
+    def _post_gamemode(self) -> None:
+        def probe() -> str:
+            out: List[str] = []
+            for argv in (["systemctl", "--user", "enable", "--now", "gamemoded"], ["gamemoded", "-t"]):
+                try:
+                    r = subprocess.run(argv, capture_output=True, text=True, check=False)
+                except OSError as e:
+                    out.append(f"{e}\n"); continue
+                out.append(r.stdout + r.stderr)
+            return "".join(out)
+        def show(out: object) -> None:
+            self._info(T("GameMode"), T("Serviço ativado.\n\nResultado do teste:\n{out}", out=str(out).strip()))
+        self._run_async(probe, on_done=show)
+
     def _post_cpupower(self) -> None:
         script_body = r"""
 echo governor=\"performance\" > /etc/default/cpupower
@@ -1618,7 +2358,7 @@ GOV=$(cat /sys/devices/system/cpu/cpu0/cpufreq/scaling_available_governors 2>/de
 for f in /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor; do echo $GOV > "$f" 2>/dev/null || true; done
 """
         self._open_terminal_and_run_pipeline(
-            " ; ".join(["set -euo pipefail","run_root_sh <<'EOS'\n"+script_body+"EOS"]),
+            f"set -euo pipefail ; run_root_sh <<'EOS'\n{script_body}EOS",
             need_root=True
         )
 
@@ -1648,15 +2388,13 @@ swapon -a || true
 EOS
 """
         self._open_terminal_and_run_pipeline(script, need_root=True)
-        swapon_out = _run_cmd_get_output("swapon --show || true").strip() or "(sem saída de swapon --show)"
-        self._info(
-            T("zram configurado"),
-            T("ZRAM ajustado automaticamente:") + "\n"
-            + T("• Tamanho:") + f" {size_str}\n"
-            + T("• Compressão:") + f" {comp}\n"
-            + T("• vm.swappiness:") + f" {swappiness}\n\n"
-            + T("Estado atual (swapon --show):") + f"\n{swapon_out}"
-        )
+        def show(out: object) -> None:
+            swapon_out = str(out).strip() or "(sem saída de swapon --show)"
+            self._info(
+                L_ZRAM_TITLE,
+                _ZRAM_MSG_TMPL.format(size=size_str, comp=comp, swap=swappiness, swapon=swapon_out),
+            )
+        self._run_async(_run_argv_get_output, ("swapon", "--show"), on_done=show)
 
     def _post_tuned(self) -> None:
         self._open_terminal_and_run_pipeline(
@@ -1667,31 +2405,29 @@ EOS
     def _post_preload(self) -> None:
         self._open_terminal_and_run_pipeline("set -euo pipefail ; run_root 'systemctl enable --now preload || true'", need_root=True)
 
-    POST_STEPS: Dict[str, Callable[[], None]] = {}
-    def _init_post_steps(self) -> None:
-        """Inicializa mapa de pós-steps por item id."""
-        self.POST_STEPS = {
-            "zram": self._post_zram,
-            "cpupower-performance": self._post_cpupower,
-            "gamemode": self._post_gamemode,
-            "tuned-performance": self._post_tuned,
-            "preload": self._post_preload,
-        }
+    # Pós-steps por item id → nome do método (resolvido com getattr só quando usado)
+    _POST_STEP_NAMES: Mapping[str, str] = MappingProxyType({
+        "zram": "_post_zram",
+        "cpupower-performance": "_post_cpupower",
+        "gamemode": "_post_gamemode",
+        "tuned-performance": "_post_tuned",
+        "preload": "_post_preload",
+    })
 
     # ------------------- Flatpak -----------------------
     def _flatpak_available(self) -> bool:
-        return shutil.which("flatpak") is not None
+        return detect_caps().flatpak
 
     def _flathub_remote_present(self) -> bool:
         """Retorna True se o remote 'flathub' já estiver configurado."""
-        try:
-            cmd = "flatpak remotes --columns=name | grep -qx flathub"
-            return subprocess.run(["bash","-lc",cmd],
-                                  stdout=subprocess.DEVNULL,
-                                  stderr=subprocess.DEVNULL,
-                                  check=False).returncode == 0
-        except Exception:
-            return False
+        if self._flathub_remote is None:
+            try:
+                out = subprocess.check_output(["flatpak", "remotes", "--columns=name"],
+                                              text=True, stderr=subprocess.DEVNULL)
+            except Exception:
+                return False
+            self._flathub_remote = "flathub" in out.split()
+        return self._flathub_remote
 
     def _ensure_flathub(self) -> bool:
         """
@@ -1701,42 +2437,47 @@ EOS
         if not self._flatpak_available():
             return False
         if not self._flathub_remote_present():
-            self._open_terminal_and_run_pipeline(
-                "set -euo pipefail; flatpak remote-add --if-not-exists flathub https://flathub.org/repo/flathub.flatpakrepo",
-                need_root=False
-            )
+            self._open_terminal_and_run_pipeline(FLATHUB_REMOTE_ADD, need_root=False)
         return True
 
     def _flatpak_install_script(self, app_id: str) -> str:
         """Monta comando de instalação via flatpak (flathub)."""
-        return f"set -euo pipefail; flatpak install -y --or-update flathub {shlex_quote(app_id)}"
+        return f"set -euo pipefail; flatpak install -y --or-update flathub {shlex.quote(app_id)}"
 
     def _flatpak_is_installed(self, app_id: str) -> bool:
         """True se app-id já estiver instalado no flatpak."""
-        try:
-            cmd = f"flatpak list --app --columns=application | grep -Fxq {shlex_quote(app_id)}"
-            return subprocess.run(["bash","-lc", cmd],
-                                  stdout=subprocess.DEVNULL,
-                                  stderr=subprocess.DEVNULL,
-                                  check=False).returncode == 0
-        except Exception:
-            return False
+        if self._flatpak_apps is None:
+            try:
+                out = subprocess.check_output(["flatpak", "list", "--app", "--columns=application"],
+                                              text=True, stderr=subprocess.DEVNULL)
+            except Exception:
+                return False
+            self._flatpak_apps = frozenset(out.split())
+        return app_id in self._flatpak_apps
 
     def _open_flatpak_app(self, app_id: str) -> None:
         """Tenta executar um aplicativo flatpak pelo app-id."""
         try:
-            subprocess.Popen(["flatpak","run",app_id])
+            spawn(["flatpak", "run", app_id])
         except Exception as e:
             self._error(T("Falha ao abrir"), T("Não foi possível iniciar '{exe}'.\n\n{e}", exe=app_id, e=str(e)))
 
     def _kernel_module_vendors(self) -> List[str]:
         return _gpu_modules_present()
 
+    def _gpu_vendor_set(self) -> frozenset:
+        """Vendors de GPU detectados (hardware ∪ módulos carregados), calculados uma vez."""
+        if self._vendors_cache is None:
+            self._vendors_cache = frozenset(self.gpu_vendors or detect_gpu_vendors()).union(
+                self._kernel_module_vendors())
+        return self._vendors_cache
+
     # ------------------- Regras de compatibilidade (GPU/CPU) -------------------
     def _block_incompatible(self, item_id: str, label: str) -> bool:
         """Valida compatibilidade de hardware básica e mostra erro se necessário."""
-        vendors = set(self.gpu_vendors or detect_gpu_vendors())
-        vendors |= set(self._kernel_module_vendors())
+        if item_id not in GPU_GATED_ITEMS:
+            return False
+        vendors = self._gpu_vendor_set()
         cpu = (self.cpu_vendor or detect_cpu_vendor()) or "desconhecido"
 
         def show(msg: str) -> None:
@@ -1762,20 +2503,21 @@ EOS
     # ------------------- AUR helper (automático) -------------------
     def _ensure_aur_helper_auto(self) -> Optional[str]:
         """Garante a presença de um helper AUR (paru/yay) quando necessário."""
-        for helper in ("paru", "yay"):
-            if shutil.which(helper):
-                return helper
+        helper = detect_caps().aur_helper
+        if helper:
+            return helper
         # Tentativas via pacman (se disponível)
+        official = _which_in_official_repos(("paru", "yay"))
         for helper in ("paru", "yay"):
-            if subprocess.run(["bash","-lc",f"pacman -Si {shlex_quote(helper)} >/dev/null 2>&1"]).returncode == 0:
-                script = f"expect_yes_pac \"run_root \\\"pacman -S --needed {shlex_quote(helper)}\\\"\""
+            if helper in official:
+                script = f"expect_yes_pac \"run_root \\\"pacman -S --needed {shlex.quote(helper)}\\\"\""
                 self._open_terminal_and_run_pipeline(script, need_root=True)
                 self._info(T("AUR"), T("Instalação de {cand} iniciada. Assim que concluir, volte e tente novamente.", cand=helper))
                 return None
         # Se houver pamac, tentar build do paru
-        if shutil.which("pamac"):
+        if detect_caps().pamac:
             helper = "paru"
-            script = f"expect_yes_pac \"run_root \\\"pamac build --no-confirm {shlex_quote(helper)}\\\"\""
+            script = f"expect_yes_pac \"run_root \\\"pamac build --no-confirm {shlex.quote(helper)}\\\"\""
             self._open_terminal_and_run_pipeline(script, need_root=True)
             self._info(T("AUR"), T("Instalação de {cand} iniciada. Assim que concluir, volte e tente novamente.", cand=helper))
             return None
@@ -1783,27 +2525,10 @@ EOS
 
     # ------------------- ZRAM parâmetros -------------------
     def _detect_total_ram_mib(self) -> int:
-        try:
-            txt = Path("/proc/meminfo").read_text()
-            for line in txt.splitlines():
-                if line.startswith("MemTotal:"):
-                    kb = int(line.split()[1])
-                    return kb // 1024
-        except Exception:
-            pass
-        try:
-            out = subprocess.check_output(["bash","-lc","free -m | awk '/^Mem:/{print $2}'"], text=True)
-            return int(out.strip())
-        except Exception:
-            return 4096
+        return total_ram_mib()
 
     def _detect_cpu_count(self) -> int:
-        try:
-            out = subprocess.check_output(["bash","-lc","nproc"], text=True)
-            c = int(out.strip())
-            return c if c > 0 else 1
-        except Exception:
-            return os.cpu_count() or 1
+        return cpu_count()
 
     def _choose_zram_params(self) -> Tuple[str, str, int]:
         """Escolhe parâmetros de zram com base em RAM total e #CPUs."""
@@ -1839,10 +2564,7 @@ EOS
             if not self._confirm(T("Configuração do Flathub"),
                                  T("Ativar o repositório Flathub agora?")):
                 return
-            self._open_terminal_and_run_pipeline(
-                "set -euo pipefail; flatpak remote-add --if-not-exists flathub https://flathub.org/repo/flathub.flatpakrepo",
-                need_root=False
-            )
+            self._open_terminal_and_run_pipeline(FLATHUB_REMOTE_ADD, need_root=False)
             self._info(T("Flathub Ativo"), T("O suporte a flatpak já está habilitado em seu sistema."))
             return
         # Flatpak ausente
@@ -1853,15 +2575,12 @@ EOS
         if not script_install:
             self._error(T("Instalação"), T("Não foi possível construir o script de instalação (helper AUR ausente?)."))
             return
-        full = " ; ".join([
-            script_install,
-            "flatpak remote-add --if-not-exists flathub https://flathub.org/repo/flathub.flatpakrepo || true",
-        ])
+        full = f"{script_install} ; {FLATHUB_REMOTE_ADD_CMD} || true"
         self._open_terminal_and_run_pipeline(full, need_root=True)
         self._info(T("Flathub Ativo"), T("O suporte a flatpak já está habilitado em seu sistema."))
 
     # ------------------- Fluxo principal de ação -------------------
-    def handle_action(self, section_key: str, item: Dict[str, str]) -> None:  # noqa: ARG002
+    def handle_action(self, section_key: str, item: Dict[str, str], _widget: Optional[Gtk.Widget] = None) -> None:  # noqa: ARG002
         """
         Fluxo de clique em item:
           - Bloqueios por compatibilidade
@@ -1881,90 +2600,47 @@ EOS
         # NVIDIA prepara lista de pacotes de acordo com o kernel
         if item["id"] == "nvidia-driver":
             pkgs = self._nvidia_packages()
-            cfg = {"packages": pkgs}
+            cfg = Action(packages=tuple(pkgs))
             if "nvidia-dkms" in pkgs and not self._ensure_kernel_headers():
                 self._info(T("Atenção"), T("Instale os headers do kernel e tente novamente para usar nvidia-dkms."))
                 return
         else:
-            cfg = ACTION_MAP.get(item["id"], {})
+            cfg = _build_action_map().get(item["id"], _NO_ACTION)
 
-        pkgs: List[str] = list(cfg.get("packages", []))            # type: ignore
-        exe: Optional[str] = cfg.get("exec")                       # type: ignore
-        flatpak_id: Optional[str] = cfg.get("flatpak")             # type: ignore
-        alt_pkgs: List[str] = list(cfg.get("alt_packages", []))    # type: ignore
+        pkgs: List[str] = list(cfg.packages)
+        exe: Optional[str] = cfg.exec
+        flatpak_id: Optional[str] = cfg.flatpak
+        alt_pkgs: List[str] = list(cfg.alt_packages)
 
         # Para o card Wine, considerar que o exec é winecfg
         if item["id"] == "wine":
             exe = "winecfg"
 
-        # --- (NOVO) Anexar prompt do GStreamer ao final da instalação do Wine ---
-        def _script_with_optional_gstreamer(base_script: str) -> str:
-            """Após instalar Wine, pergunta (zenity/TTY) e instala GStreamer na mesma execução."""
+        # --- GStreamer opcional do Wine: perguntado antes, instalado na mesma transação ---
+        def _optional_gstreamer_pkgs() -> List[str]:
+            """Pacotes GStreamer faltantes que o usuário aceitou instalar junto com o Wine."""
             if item["id"] != "wine":
-                return base_script
-
+                return []
             gst_missing = self._missing_packages(GSTREAMER_WINE_PKGS)
             if not gst_missing:
-                return base_script  # nada a ofertar
-
-            # Preparar instalação (Repo > AUR) dos pacotes que realmente faltam
-            official_gst, aur_gst = self._split_official_aur(gst_missing)
-            gst_script = self._build_install_script(official_gst, aur_gst)
-            if not gst_script:
-                return base_script  # sem helper AUR disponível etc.
-
-            pkgs_str = " ".join(gst_missing)
-            prompt_title = T("Confirmar")
-            prompt_text  = T("Instalar suporte multimídia (GStreamer) para o Wine?")
-
-            ask_block = f"""
-# --- Perguntar sobre GStreamer ao final do Wine ---
-_do_gst=0
-if command -v zenity >/dev/null 2>&1; then
-  zenity --question --title="{prompt_title}" --no-wrap --text="{prompt_text}\\n\\nPacotes: {pkgs_str}" && _do_gst=1 || true
-else
-  printf "\\n{prompt_text}\\nPacotes: {pkgs_str}\\n[y/N]: "
-  read -r _ans; case "$_ans" in [yY]|[yY][eE][sS]|[sS]) _do_gst=1;; esac
-fi
-if [ "$_do_gst" -eq 1 ]; then
-  {gst_script}
-fi
-""".strip("\n")
-
-            return base_script + " ; " + ask_block
-
-        # --------- (NOVO) Gatilho explícito de multilib para apps conhecidos ---------
-        requires_multilib = item["id"] in {"steam", "wine", "mangohud"}
-        if requires_multilib and not self._multilib_enabled():
-            if self._confirm(T("Multilib"),
-                             T("Alguns pacotes 32-bit requerem o repositório [multilib].\n\nAtivar automaticamente e atualizar bancos de dados agora?")):
-                script = r"""
-run_root_sh <<'EOS'
-set -euo pipefail
-cp /etc/pacman.conf{,.bak.$(date +%F-%H%M%S)}
-sed -ri 's/^\s*#\s*\[multilib\]/[multilib]/' /etc/pacman.conf
-sed -ri '/^\s*\[multilib\]/,/\s*(\[|\Z)/ { s/^\s*#\s*(Include)/\1/ }' /etc/pacman.conf
-grep -q '^\[multilib\]' /etc/pacman.conf
-pacman -Syy
-EOS
-"""
-                self._open_terminal_and_run_pipeline(script, need_root=True)
-            else:
-                self._info(T("Multilib"), T("Ative manualmente em /etc/pacman.conf e rode: sudo pacman -Syy"))
-                return
+                return []  # nada a ofertar
+            if not self._confirm(T("Confirmar"), T("Instalar suporte multimídia (GStreamer) para o Wine?"),
+                                 " ".join(gst_missing)):
+                return []
+            return gst_missing
 
         # Resolver provedores virtuais (evita prompts do AUR)
         pkgs = self._resolve_virtual_pkgs(pkgs)
 
         # Já instalado? Oferece abrir
-        if exe and shutil.which(exe):
+        if exe and _which(exe):
             if self._confirm(T("Abrir"), T("Abrir {label} agora?", label=item['label'])):
                 try:
                     cli_like = exe in {"steam-acolyte", "paru", "yay"}
                     if cli_like:
                         self._open_terminal_and_run_pipeline(exe, need_root=False, ensure_policy=False)
                     else:
-                        subprocess.Popen([exe])
+                        spawn([exe])
                 except Exception as e:
                     self._error(T("Falha ao abrir"), T("Não foi possível iniciar '{exe}'.\n\n{e}", exe=exe, e=str(e)))
             return
@@ -1974,11 +2650,12 @@ EOS
                 self._open_flatpak_app(flatpak_id)
             return
 
-        # Descobre o que falta instalar
-        to_install: List[str] = self._missing_packages(pkgs)
+        # Descobre o que falta instalar (pacotes + alternativas numa só checagem)
+        missing = set(self._missing_packages([*pkgs, *alt_pkgs]))
+        to_install: List[str] = [p for p in pkgs if p in missing]
 
         # Se uma alternativa aceita já estiver instalada, não instale nada
-        if to_install and alt_pkgs and self._any_installed(alt_pkgs):
+        if to_install and any(p and p not in missing for p in alt_pkgs):
             to_install = []
 
         # Nada a instalar -> para itens com exec (ex.: wine), oferecer abrir
@@ -1986,31 +2663,21 @@ EOS
             if exe:
                 if self._confirm(T("Abrir"), T("Abrir {label} agora?", label=item['label'])):
                     try:
-                        subprocess.Popen([exe])
+                        spawn([exe])
                     except Exception as e:
                         self._error(T("Falha ao abrir"), T("Não foi possível iniciar '{exe}'.\n\n{e}", exe=exe, e=str(e)))
                 return
             self._info(T("Nada a instalar"), T("Não há pacotes pendentes para {label}.", label=item["label"]))
             return
 
-        # Multilib (fallback baseado em lib32-*)
-        if any(p.startswith("lib32-") for p in to_install) and not self._multilib_enabled():
-            if self._confirm(T("Multilib"),
-                             T("Alguns pacotes 32-bit requerem o repositório [multilib].\n\nAtivar automaticamente e atualizar bancos de dados agora?")):
-                script = r"""
-run_root_sh <<'EOS'
-set -euo pipefail
-cp /etc/pacman.conf{,.bak.$(date +%F-%H%M%S)}
-sed -ri 's/^\s*#\s*\[multilib\]/[multilib]/' /etc/pacman.conf
-sed -ri '/^\s*\[multilib\]/,/\s*(\[|\Z)/ { s/^\s*#\s*(Include)/\1/ }' /etc/pacman.conf
-grep -q '^\[multilib\]' /etc/pacman.conf
-pacman -Syy
-EOS
-"""
-                self._open_terminal_and_run_pipeline(script, need_root=True)
-            else:
-                self._info(T("Multilib"), T("Ative manualmente em /etc/pacman.conf e rode: sudo pacman -Syy"))
-                return
+        # Multilib: apps conhecidos ou qualquer lib32-* pendente (uma única checagem)
+        requires_multilib = (item["id"] in MULTILIB_ITEMS
+                             or any(p.startswith("lib32-") for p in to_install))
+        if requires_multilib and not self._ensure_multilib():
+            return
+
+        # Wine + GStreamer num único pacman/helper -S (um só sync de DB e resolução de deps)
+        to_install += [p for p in _optional_gstreamer_pkgs() if p not in to_install]
 
         # --- Seleção automática da fonte (Repo > Flatpak > AUR) ---
         official, aur = self._split_official_aur(to_install)
@@ -2018,7 +2685,7 @@ EOS
                  item["id"], bool(official), bool(aur), bool(flatpak_id))
 
         if official:
-            need_helper = bool(aur) and (self.pkg_manager not in ("paru","yay","pamac")) and not (shutil.which("paru") or shutil.which("yay"))
+            need_helper = bool(aur) and (self.pkg_manager not in ("paru","yay","pamac")) and not detect_caps().aur_helper
             if need_helper:
                 helper = self._ensure_aur_helper_auto()
                 if helper is None and self.pkg_manager != "pamac":
@@ -2028,8 +2695,6 @@ EOS
             if not script:
                 self._error(T("Instalação"), T("Não foi possível construir o script de instalação (helper AUR ausente?)."))
                 return
-            # se for o Wine, anexar pergunta do GStreamer só no final
-            script = _script_with_optional_gstreamer(script)
             pkgs_str = " ".join(to_install)
             if not self._confirm(T("Confirmar"), T("Instalar {pkgs_str}?", pkgs_str=pkgs_str)):
                 return
@@ -2037,7 +2702,7 @@ EOS
 
         elif flatpak_id and self._flatpak_available():
             # Garante o remote e instala
-            script = f"set -euo pipefail; flatpak install -y --or-update flathub {shlex_quote(flatpak_id)}"
+            script = self._flatpak_install_script(flatpak_id)
             self._ensure_flathub()
             if not self._confirm(T("Confirmar"),
                                  T("Instalar {label} via Flatpak?", label=item['label'])):
@@ -2046,7 +2711,7 @@ EOS
 
         else:
             # Tentar somente AUR
-            need_helper = (self.pkg_manager not in ("paru","yay","pamac")) and not (shutil.which("paru") or shutil.which("yay"))
+            need_helper = (self.pkg_manager not in ("paru","yay","pamac")) and not detect_caps().aur_helper
             if need_helper:
                 helper = self._ensure_aur_helper_auto()
                 if helper is None and self.pkg_manager != "pamac":
@@ -2056,15 +2721,14 @@ EOS
             if not script:
                 self._error(T("Instalação"), T("Não foi possível construir o script de instalação (helper AUR ausente?)."))
                 return
-            # se for o Wine, anexar pergunta do GStreamer só no final
-            script = _script_with_optional_gstreamer(script)
             pkgs_str = " ".join(to_install)
             if not self._confirm(T("Confirmar"), T("Instalar {pkgs_str}?", pkgs_str=pkgs_str)):
                 return
             self._open_terminal_and_run_pipeline(script, need_root=True)
 
         # Pós-steps (best-effort)
-        post = self.POST_STEPS.get(item["id"])
+        name = self._POST_STEP_NAMES.get(item["id"])
+        post = getattr(self, name, None) if name else None
         if post:
             try:
                 post()
@@ -2092,9 +2756,7 @@ EOS
         )
         dlg.set_default_size(420, 200); dlg.set_size_request(420, 200)
         dlg.format_secondary_text(T(primary) + (("\n\n" + T(secondary)) if secondary else ""))
-        for ch in dlg.get_message_area().get_children():
-            if isinstance(ch, Gtk.Label):
-                ch.set_xalign(0.5); ch.set_justify(Gtk.Justification.CENTER)
+        _center_message_labels(dlg)
         dlg.set_default_response(Gtk.ResponseType.OK)
         resp = dlg.run(); dlg.destroy()
         return resp == Gtk.ResponseType.OK
@@ -2111,9 +2773,7 @@ EOS
         )
         dlg.set_default_size(420, 200); dlg.set_size_request(420, 200)
         dlg.format_secondary_text(T(text))
-        for ch in dlg.get_message_area().get_children():
-            if isinstance(ch, Gtk.Label):
-                ch.set_xalign(0.5); ch.set_justify(Gtk.Justification.CENTER)
+        _center_message_labels(dlg)
         dlg.set_default_response(Gtk.ResponseType.OK)
         dlg.run(); dlg.destroy()
 
@@ -2129,9 +2789,7 @@ EOS
         )
         dlg.set_default_size(420, 200); dlg.set_size_request(420, 200)
         dlg.format_secondary_text(T(text))
-        for ch in dlg.get_message_area().get_children():
-            if isinstance(ch, Gtk.Label):
-                ch.set_xalign(0.5); ch.set_justify(Gtk.Justification.CENTER)
+        _center_message_labels(dlg)
         dlg.set_default_response(Gtk.ResponseType.CLOSE)
         dlg.run(); dlg.destroy()
 
@@ -2140,14 +2798,13 @@ EOS
         dlg = Gtk.AboutDialog(transient_for=self, modal=True, use_header_bar=False)
         dlg.set_title(T("Sobre")); dlg.set_program_name(APP_TITLE)
         # <<< ALTERADO: inclui a versão no texto e define version do AboutDialog
-        dlg.set_comments(f"{T(APP_SUBTITLE)}\n\n" + T("Desenvolvido por Gabriel Ruas Santos"))
+        dlg.set_comments(f"{L_APP_SUBTITLE}\n\n" + T("Desenvolvido por Gabriel Ruas Santos"))
         dlg.set_version(APP_VERSION)
         # Preferir ícone local (SVG/PNG) se existir; senão usar nome do tema
         icon_path = find_local_icon_file(APP_ICON_NAME)
         if icon_path:
             try:
-                pb = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(icon_path), 128, 128, True)
-                dlg.set_logo(pb)
+                dlg.set_logo(_pixbuf_at_scale(str(icon_path), 128))
             except Exception:
                 dlg.set_logo_icon_name(APP_ICON_NAME)
         else:
@@ -2162,11 +2819,11 @@ EOS
     # ============================
 
     def _nvidia_loaded(self) -> bool:
-        """True se módulo 'nvidia' estiver carregado."""
+        """True se módulo 'nvidia' estiver carregado (leitura direta de /proc/modules, sem cache)."""
         try:
-            out = subprocess.check_output(["bash","-lc","lsmod | awk '{print $1}' | grep -x nvidia || true"], text=True)
-            return bool(out.strip())
-        except Exception:
+            with open("/proc/modules", "rb") as fh:
+                return any(line.startswith(b"nvidia ") for line in fh)
+        except OSError:
             return False
 
     def _ensure_kernel_headers(self) -> bool:
@@ -2183,7 +2840,7 @@ EOS
         LOG.info("Headers de kernel recomendados para %s → %s", ver, cand)
         if self._confirm(T("Headers do kernel"),
                          T("Kernel atual: {ver}\nPara compilar módulos DKMS (ex.: nvidia-dkms) é recomendado instalar {cand}.\n\nInstalar agora?", ver=ver, cand=cand)):
-            script = f"expect_yes_pac \"run_root \\\"pacman -S --needed {shlex_quote(cand)}\\\"\""
+            script = f"expect_yes_pac \"run_root \\\"pacman -S --needed {shlex.quote(cand)}\\\"\""
             self._open_terminal_and_run_pipeline(script, need_root=True)
             self._info(T("Headers do kernel"), T("Instalação de {cand} iniciada. Assim que concluir, volte e tente novamente.", cand=cand))
             return False
@@ -2205,13 +2862,14 @@ EOS
                 open_candidates.append("nvidia-open-dkms")
             if open_first != "nvidia-open":
                 open_candidates.append("nvidia-open")
+            try:
+                official = _which_in_official_repos(open_candidates)
+            except Exception:
+                official = set()
             for cand in open_candidates:
-                try:
-                    if _pkg_in_official_repos_cached(cand):
-                        pkgs.insert(0, cand)
-                        return pkgs
-                except Exception:
-                    pass
+                if cand in official:
+                    pkgs.insert(0, cand)
+                    return pkgs
 
         if "-lts" in ver:
             pkgs.insert(0, "nvidia-lts")
@@ -2222,15 +2880,6 @@ EOS
         return pkgs
 
 
-# =============================================================================
-# Utils auxiliares
-# =============================================================================
-
-def shlex_quote(s: str) -> str:
-    """Alias com type-hint para shlex.quote."""
-    return shlex.quote(s)
-
-
 # =============================================================================
 # Main
 # =============================================================================
@@ -2238,17 +2887,11 @@ def shlex_quote(s: str) -> str:
 def main() -> None:
     """Ponto de entrada da aplicação GTK."""
     _bootstrap_app_identity()  # garante app-id e ícone antes de abrir a janela
+    _prefetch_monitor_metrics()
     win = App()
     win.connect("destroy", Gtk.main_quit)
     win.show_all()
     Gtk.main()
 
-def _print_version_and_exit() -> None:
-    """Imprime a versão no CLI e encerra."""
-    print(f"{APP_TITLE} {APP_VERSION}")
-    sys.exit(0)
-
 if __name__ == "__main__":
-    if "--version" in sys.argv:
-        _print_version_and_exit()
     main()